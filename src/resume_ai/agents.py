@@ -1,39 +1,120 @@
 from __future__ import annotations
 
 import json
-import re
 
-from .config import Settings
+from .config import AgentLLMConfig, Settings
 from .llm import MultiProviderLLMClient
 from .prompts import (
     INTERN_SYSTEM_PROMPT,
+    JSON_RETRY_SUFFIX,
+    REVIEWER_RESPONSE_SCHEMA,
     REVIEWER_SYSTEM_PROMPT,
+    SUPERVISOR_RESPONSE_SCHEMA,
     SUPERVISOR_SYSTEM_PROMPT,
     intern_draft_user_prompt,
     intern_revision_user_prompt,
+    intern_section_user_prompt,
+    intern_summary_user_prompt,
     reviewer_user_prompt,
     supervisor_user_prompt,
 )
-from .types import ReviewFeedback, SupervisorDecision
+from .supervisor_policy import SupervisorPolicy
+from .types import JSONParseStats, ReviewFeedback, SupervisorDecision
 
 
-def _extract_json_object(text: str) -> dict:
-    text = text.strip()
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        pass
+def _strip_reasoning(text: str) -> str:
+    # Reasoning models such as deepseek-r1 emit a <think>...</think> block before the answer.
+    if "</think>" in text:
+        return text.rsplit("</think>", 1)[1]
+    return text
+
+
+def _iter_balanced_objects(text: str):
+    """Yield balanced `{...}` spans in order of their opening brace, ignoring braces inside JSON strings.
 
-    # Fallback for models that wrap JSON in markdown fences.
-    match = re.search(r"\{[\s\S]*\}", text)
-    if not match:
-        return {}
+    A single pass keeps a stack of open-brace positions, so a stray `{` in prose
+    stays unmatched instead of swallowing the rest of the text. Outer spans
+    come before the spans nested in them, so a valid object inside a malformed
+    outer one is still tried.
+    """
+    open_braces: list[int] = []
+    spans: list[tuple[int, int]] = []
+    in_string = False
+    escaped = False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
 
-    candidate = match.group(0)
+        if ch == '"' and open_braces:
+            in_string = True
+        elif ch == "{":
+            open_braces.append(i)
+        elif ch == "}" and open_braces:
+            spans.append((open_braces.pop(), i + 1))
+
+    spans.sort()
+    for start, end in spans:
+        yield text[start:end]
+
+
+def _extract_json_object(text: str) -> dict | None:
+    text = _strip_reasoning(text).strip()
     try:
-        return json.loads(candidate)
+        payload = json.loads(text)
     except json.JSONDecodeError:
-        return {}
+        payload = None
+    if isinstance(payload, dict):
+        return payload
+
+    # Fallback for models that wrap JSON in markdown fences or surrounding prose.
+    for candidate in _iter_balanced_objects(text):
+        try:
+            payload = json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(payload, dict):
+            return payload
+
+    return None
+
+
+def _chat_json(
+    llm: MultiProviderLLMClient,
+    system_prompt: str,
+    user_prompt: str,
+    config: AgentLLMConfig,
+    schema: dict,
+    max_retries: int,
+    stats: JSONParseStats,
+    label: str,
+) -> tuple[dict, str]:
+    prompt = user_prompt
+    raw = ""
+    for attempt in range(max_retries + 1):
+        if attempt:
+            stats.retries += 1
+            prompt = user_prompt + JSON_RETRY_SUFFIX
+        stats.calls += 1
+        raw = llm.chat(
+            system_prompt=system_prompt,
+            user_prompt=prompt,
+            config=config,
+            response_schema=schema,
+            label=label,
+        )
+        payload = _extract_json_object(raw)
+        if payload is not None:
+            return payload, raw
+        stats.parse_failures += 1
+
+    stats.fallbacks += 1
+    return {}, raw
 
 
 class InternAgent:
@@ -46,6 +127,27 @@ class InternAgent:
             system_prompt=INTERN_SYSTEM_PROMPT,
             user_prompt=intern_draft_user_prompt(job_description=job_description, context=context),
             config=self.settings.intern,
+            label="intern.draft",
+        )
+
+    def draft_section(self, job_description: str, heading: str, context: str) -> str:
+        return self.llm.chat(
+            system_prompt=INTERN_SYSTEM_PROMPT,
+            user_prompt=intern_section_user_prompt(job_description=job_description, heading=heading, context=context),
+            config=self.settings.intern,
+            label=f"intern.draft_section.{heading.lower()}",
+        )
+
+    def draft_summary(self, job_description: str, context: str, sections: str) -> str:
+        return self.llm.chat(
+            system_prompt=INTERN_SYSTEM_PROMPT,
+            user_prompt=intern_summary_user_prompt(
+                job_description=job_description,
+                context=context,
+                sections=sections,
+            ),
+            config=self.settings.intern,
+            label="intern.draft_summary",
         )
 
     def revise(
@@ -66,6 +168,7 @@ class InternAgent:
                 context=context,
             ),
             config=self.settings.intern,
+            label="intern.revise",
         )
 
 
@@ -73,15 +176,20 @@ class ReviewerAgent:
     def __init__(self, llm: MultiProviderLLMClient, settings: Settings) -> None:
         self.llm = llm
         self.settings = settings
+        self.parse_stats = JSONParseStats()
 
     def review(self, job_description: str, resume: str) -> ReviewFeedback:
-        raw = self.llm.chat(
+        payload, raw = _chat_json(
+            self.llm,
             system_prompt=REVIEWER_SYSTEM_PROMPT,
             user_prompt=reviewer_user_prompt(job_description=job_description, resume=resume),
             config=self.settings.reviewer,
+            schema=REVIEWER_RESPONSE_SCHEMA,
+            max_retries=self.settings.json_max_retries,
+            stats=self.parse_stats,
+            label="reviewer.review",
         )
 
-        payload = _extract_json_object(raw)
         decision = str(payload.get("decision", "revise")).lower().strip()
         if decision not in {"accept", "revise"}:
             decision = "revise"
@@ -112,23 +220,33 @@ class SupervisorAgent:
     def __init__(self, llm: MultiProviderLLMClient, settings: Settings) -> None:
         self.llm = llm
         self.settings = settings
+        self.parse_stats = JSONParseStats()
+        self.policy = SupervisorPolicy(settings.supervisor_policy, max_rounds=settings.max_revision_rounds)
 
     def decide(
         self,
         review_feedback: ReviewFeedback,
         round_number: int,
     ) -> SupervisorDecision:
-        raw = self.llm.chat(
+        decision = self.policy.resolve(review_feedback, round_number)
+        if decision is not None:
+            return decision
+
+        payload, raw = _chat_json(
+            self.llm,
             system_prompt=SUPERVISOR_SYSTEM_PROMPT,
             user_prompt=supervisor_user_prompt(
                 round_number=round_number,
                 max_rounds=self.settings.max_revision_rounds,
-                reviewer_feedback_json=review_feedback.raw_text,
+                reviewer_feedback_json=_strip_reasoning(review_feedback.raw_text).strip(),
             ),
             config=self.settings.supervisor,
+            schema=SUPERVISOR_RESPONSE_SCHEMA,
+            max_retries=self.settings.json_max_retries,
+            stats=self.parse_stats,
+            label="supervisor.decide",
         )
 
-        payload = _extract_json_object(raw)
         action = str(payload.get("action", review_feedback.decision)).lower().strip()
         if action not in {"accept", "revise"}:
             action = "revise"
@@ -143,7 +261,8 @@ class SupervisorAgent:
                 else "Reviewer requested targeted edits."
             )
 
-        if action == "accept" and review_feedback.score < 7.5 and round_number < self.settings.max_revision_rounds:
+        min_accept_score = self.settings.supervisor_policy.min_accept_score
+        if action == "accept" and review_feedback.score < min_accept_score and round_number < self.settings.max_revision_rounds:
             action = "revise"
             if not focus:
                 focus = review_feedback.edits[:3]
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from .types import Chunk, JSONParseStats, RetrievalHit, ReviewFeedback, SupervisorDecision
+
+
+STATE_FILENAME = "state.json"
+STATE_VERSION = 1
+
+
+class CheckpointError(ValueError):
+    """Raised when a run checkpoint cannot be read or does not match the run."""
+
+
+@dataclass
+class RunState:
+    job_description_sha256: str
+    retrieval_hits: list[RetrievalHit] | None = None
+    draft_resume: str | None = None
+    current_resume: str | None = None
+    review_rounds: list[ReviewFeedback] = field(default_factory=list)
+    supervisor_rounds: list[SupervisorDecision] = field(default_factory=list)
+    revised_rounds: int = 0
+    completed: bool = False
+    # Reviewer/supervisor JSON parse counts across every process that worked on this run.
+    json_parse: dict[str, JSONParseStats] = field(default_factory=dict)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "version": STATE_VERSION,
+            "job_description_sha256": self.job_description_sha256,
+            "retrieval_hits": (
+                None
+                if self.retrieval_hits is None
+                else [
+                    {
+                        "score": hit.score,
+                        "chunk_id": hit.chunk.chunk_id,
+                        "source": hit.chunk.source,
+                        "duplicate_sources": hit.chunk.duplicate_sources,
+                        "text": hit.chunk.text,
+                    }
+                    for hit in self.retrieval_hits
+                ]
+            ),
+            "draft_resume": self.draft_resume,
+            "current_resume": self.current_resume,
+            "review_rounds": [item.to_dict() for item in self.review_rounds],
+            "supervisor_rounds": [item.to_dict() for item in self.supervisor_rounds],
+            "revised_rounds": self.revised_rounds,
+            "completed": self.completed,
+            "json_parse": {name: stats.to_dict() for name, stats in self.json_parse.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> RunState:
+        if data.get("version") != STATE_VERSION:
+            raise CheckpointError(f"Unsupported checkpoint version: {data.get('version')!r}.")
+
+        raw_hits = data.get("retrieval_hits")
+        hits = None
+        if raw_hits is not None:
+            hits = [
+                RetrievalHit(
+                    chunk=Chunk(
+                        chunk_id=item["chunk_id"],
+                        source=item["source"],
+                        text=item["text"],
+                        duplicate_sources=list(item.get("duplicate_sources", [])),
+                    ),
+                    score=float(item["score"]),
+                )
+                for item in raw_hits
+            ]
+
+        return cls(
+            job_description_sha256=str(data["job_description_sha256"]),
+            retrieval_hits=hits,
+            draft_resume=data.get("draft_resume"),
+            current_resume=data.get("current_resume"),
+            review_rounds=[ReviewFeedback(**item) for item in data.get("review_rounds", [])],
+            supervisor_rounds=[SupervisorDecision(**item) for item in data.get("supervisor_rounds", [])],
+            revised_rounds=int(data.get("revised_rounds", 0)),
+            completed=bool(data.get("completed", False)),
+            json_parse={name: JSONParseStats(**item) for name, item in data.get("json_parse", {}).items()},
+        )
+
+
+class RunCheckpoint:
+    """Persists orchestrator state to a run directory after every completed step."""
+
+    def __init__(self, run_dir: str | Path) -> None:
+        self.run_dir = Path(run_dir)
+        self.state_path = self.run_dir / STATE_FILENAME
+
+    def exists(self) -> bool:
+        return self.state_path.exists()
+
+    def start(self, job_description: str, resume: bool = False) -> RunState:
+        digest = _sha256(job_description)
+        if not resume or not self.exists():
+            state = RunState(job_description_sha256=digest)
+            self.save(state)
+            return state
+
+        state = self.load()
+        if state.job_description_sha256 != digest:
+            raise CheckpointError(
+                f"Checkpoint in {self.run_dir} was created for a different job description."
+            )
+        return state
+
+    def load(self) -> RunState:
+        try:
+            data = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except FileNotFoundError as exc:
+            raise CheckpointError(f"No checkpoint found at {self.state_path}.") from exc
+        except json.JSONDecodeError as exc:
+            raise CheckpointError(f"Checkpoint file is corrupt: {self.state_path}.") from exc
+
+        try:
+            return RunState.from_dict(data)
+        except (KeyError, TypeError) as exc:
+            raise CheckpointError(f"Checkpoint file is malformed: {self.state_path}.") from exc
+
+    def save(self, state: RunState) -> None:
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps(state.to_dict(), indent=2), encoding="utf-8")
+        os.replace(tmp_path, self.state_path)
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
@@ -1,18 +1,154 @@
 from __future__ import annotations
 
 import re
+import sys
+from collections.abc import Iterator
+
+import numpy as np
 
 from .types import Chunk, Document
 
 
-def chunk_text(text: str, chunk_size: int, chunk_overlap: int) -> list[str]:
-    normalized = re.sub(r"\n{3,}", "\n\n", text).strip()
+class ChunkTable:
+    """Chunks stored as (document index, start, end) offsets into shared per-document text.
+
+    Sources are interned once per document and chunk text is only sliced out
+    when a chunk is materialized, so overlapping chunks never copy text.
+    `ordinals` holds each chunk's number within its source, used for chunk ids.
+    `duplicates` maps a chunk index to the other sources its text was found in.
+    """
+
+    __slots__ = ("sources", "texts", "doc_indices", "starts", "ends", "ordinals", "duplicates")
+
+    def __init__(
+        self,
+        sources: list[str],
+        texts: list[str],
+        doc_indices: np.ndarray | list[int],
+        starts: np.ndarray | list[int],
+        ends: np.ndarray | list[int],
+        ordinals: np.ndarray | list[int],
+        duplicates: dict[int, list[str]] | None = None,
+    ) -> None:
+        self.sources = [sys.intern(source) for source in sources]
+        self.texts = texts
+        self.doc_indices = np.asarray(doc_indices, dtype=np.int32)
+        self.starts = np.asarray(starts, dtype=np.int64)
+        self.ends = np.asarray(ends, dtype=np.int64)
+        self.ordinals = np.asarray(ordinals, dtype=np.int32)
+        self.duplicates = duplicates or {}
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index: int) -> Chunk:
+        doc = int(self.doc_indices[index])
+        source = self.sources[doc]
+        return Chunk(
+            chunk_id=f"{source}::chunk::{int(self.ordinals[index])}",
+            source=source,
+            text=self.text(index),
+            duplicate_sources=list(self.duplicates.get(int(index), [])),
+        )
+
+    def __iter__(self) -> Iterator[Chunk]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def text(self, index: int) -> str:
+        doc = int(self.doc_indices[index])
+        return self.texts[doc][int(self.starts[index]) : int(self.ends[index])]
+
+    def iter_texts(self) -> Iterator[str]:
+        for i in range(len(self)):
+            yield self.text(i)
+
+    def subset(self, indices: list[int], duplicates: dict[int, list[str]]) -> ChunkTable:
+        """Keep the chunks at `indices` (in order); `duplicates` is keyed by the original indices.
+
+        Documents left without any chunk are dropped along with their text.
+        """
+        positions = np.asarray(indices, dtype=np.int64)
+        doc_indices = self.doc_indices[positions]
+        used, remapped = np.unique(doc_indices, return_inverse=True)
+        return ChunkTable(
+            [self.sources[int(doc)] for doc in used],
+            [self.texts[int(doc)] for doc in used],
+            remapped.reshape(-1),
+            self.starts[positions],
+            self.ends[positions],
+            self.ordinals[positions],
+            {new: duplicates[old] for new, old in enumerate(indices) if duplicates.get(old)},
+        )
+
+    @classmethod
+    def from_chunks(cls, chunks: list[Chunk]) -> ChunkTable:
+        """Pack materialized chunks, joining consecutive chunks of one source into a buffer.
+
+        Chunk numbers are taken from `::chunk::<n>` ids when present and otherwise
+        counted per source, so ids stay unique even if a source recurs non-contiguously.
+        """
+        sources: list[str] = []
+        texts: list[str] = []
+        doc_indices: list[int] = []
+        starts: list[int] = []
+        ends: list[int] = []
+        ordinals: list[int] = []
+        next_ordinal: dict[str, int] = {}
+        pieces: list[str] = []
+        duplicates: dict[int, list[str]] = {}
+        offset = 0
+
+        for i, chunk in enumerate(chunks):
+            if chunk.duplicate_sources:
+                duplicates[i] = list(chunk.duplicate_sources)
+            if not sources or chunk.source != sources[-1]:
+                if pieces:
+                    texts.append("\n\n".join(pieces))
+                sources.append(chunk.source)
+                pieces = []
+                offset = 0
+            elif pieces:
+                offset += 2
+            doc_indices.append(len(sources) - 1)
+            starts.append(offset)
+            offset += len(chunk.text)
+            ends.append(offset)
+            pieces.append(chunk.text)
+
+            prefix, _, number = chunk.chunk_id.rpartition("::chunk::")
+            ordinal = int(number) if prefix == chunk.source and number.isdigit() else next_ordinal.get(chunk.source, 0)
+            ordinals.append(ordinal)
+            next_ordinal[chunk.source] = max(next_ordinal.get(chunk.source, 0), ordinal + 1)
+
+        if pieces:
+            texts.append("\n\n".join(pieces))
+
+        return cls(sources, texts, doc_indices, starts, ends, ordinals, duplicates)
+
+
+def ordinals_from_grouping(doc_indices: np.ndarray) -> np.ndarray:
+    """Number chunks within each run of equal document indices (for tables saved without ordinals)."""
+    doc_indices = np.asarray(doc_indices)
+    if doc_indices.size == 0:
+        return np.zeros(0, dtype=np.int32)
+    positions = np.arange(doc_indices.size)
+    run_starts = np.r_[True, doc_indices[1:] != doc_indices[:-1]]
+    return (positions - np.maximum.accumulate(np.where(run_starts, positions, 0))).astype(np.int32)
+
+
+def normalize_text(text: str) -> str:
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def chunk_spans(normalized: str, chunk_size: int, chunk_overlap: int) -> list[tuple[int, int]]:
+    """Return (start, end) offsets of whitespace-trimmed chunks of already normalized text."""
     if not normalized:
         return []
     if len(normalized) <= chunk_size:
-        return [normalized]
+        return [(0, len(normalized))]
 
-    chunks: list[str] = []
+    spans: list[tuple[int, int]] = []
     start = 0
     text_length = len(normalized)
 
@@ -31,9 +167,13 @@ def chunk_text(text: str, chunk_size: int, chunk_overlap: int) -> list[str]:
         if end <= start:
             end = min(start + chunk_size, text_length)
 
-        chunk = normalized[start:end].strip()
-        if chunk:
-            chunks.append(chunk)
+        span_start, span_end = start, end
+        while span_start < span_end and normalized[span_start].isspace():
+            span_start += 1
+        while span_end > span_start and normalized[span_end - 1].isspace():
+            span_end -= 1
+        if span_start < span_end:
+            spans.append((span_start, span_end))
 
         if end >= text_length:
             break
@@ -43,15 +183,37 @@ def chunk_text(text: str, chunk_size: int, chunk_overlap: int) -> list[str]:
             next_start = end
         start = next_start
 
-    return chunks
+    return spans
+
+
+def chunk_text(text: str, chunk_size: int, chunk_overlap: int) -> list[str]:
+    normalized = normalize_text(text)
+    return [normalized[start:end] for start, end in chunk_spans(normalized, chunk_size, chunk_overlap)]
+
 
+def build_chunks(documents: list[Document], chunk_size: int, chunk_overlap: int) -> ChunkTable:
+    sources: list[str] = []
+    texts: list[str] = []
+    doc_indices: list[int] = []
+    starts: list[int] = []
+    ends: list[int] = []
+    ordinals: list[int] = []
+    duplicates: dict[int, list[str]] = {}
 
-def build_chunks(documents: list[Document], chunk_size: int, chunk_overlap: int) -> list[Chunk]:
-    chunks: list[Chunk] = []
     for doc in documents:
-        pieces = chunk_text(doc.text, chunk_size=chunk_size, chunk_overlap=chunk_overlap)
-        for i, piece in enumerate(pieces):
-            chunk_id = f"{doc.source}::chunk::{i}"
-            chunks.append(Chunk(chunk_id=chunk_id, source=doc.source, text=piece))
+        normalized = normalize_text(doc.text)
+        spans = chunk_spans(normalized, chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        if not spans:
+            continue
+        doc_index = len(sources)
+        sources.append(doc.source)
+        texts.append(normalized)
+        for ordinal, (start, end) in enumerate(spans):
+            if doc.duplicate_sources:
+                duplicates[len(starts)] = list(doc.duplicate_sources)
+            doc_indices.append(doc_index)
+            starts.append(start)
+            ends.append(end)
+            ordinals.append(ordinal)
 
-    return chunks
+    return ChunkTable(sources, texts, doc_indices, starts, ends, ordinals, duplicates)
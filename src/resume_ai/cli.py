@@ -5,11 +5,16 @@ import json
 from pathlib import Path
 
 from .agents import InternAgent, ReviewerAgent, SupervisorAgent
+from .checkpoint import CheckpointError, RunCheckpoint
 from .chunking import build_chunks
 from .config import ConfigError, load_settings
-from .document_loader import DocumentLoadError, load_documents, read_file_text
+from .dedup import deduplicate_chunks, deduplicate_documents
+from .document_loader import DocumentLoadError, discover_files, parse_documents, read_file_text
+from .extraction_cache import ExtractionCache
 from .llm import LLMClientError, MultiProviderLLMClient
 from .orchestrator import ResumeOrchestrator
+from .profiling import DISABLED_PROFILER, StageProfiler
+from .query_cache import QueryCache
 from .vector_store import LocalVectorStore, VectorStoreError
 
 
@@ -54,6 +59,36 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Load existing index if present instead of rebuilding.",
     )
+    parser.add_argument(
+        "--extraction-cache-dir",
+        default=".cache/extracted_text",
+        help="Directory for cached text extracted from PDF/DOCX files.",
+    )
+    parser.add_argument(
+        "--no-extraction-cache",
+        action="store_true",
+        help="Always re-parse PDF/DOCX files instead of using cached text.",
+    )
+    parser.add_argument(
+        "--query-cache",
+        default=".cache/query_cache.json",
+        help="File for cached query embeddings and retrieval results.",
+    )
+    parser.add_argument(
+        "--no-query-cache",
+        action="store_true",
+        help="Always encode and search queries instead of using cached results.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile each pipeline stage with cProfile and tracemalloc.",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        default="outputs/profile",
+        help="Directory for per-stage profiles, allocation reports and summary.json.",
+    )
     parser.add_argument(
         "--supervisor-model",
         default=None,
@@ -69,11 +104,22 @@ def parse_args() -> argparse.Namespace:
         default=None,
         help="Optional runtime override for reviewer model name.",
     )
+    parser.add_argument(
+        "--run-dir",
+        default=None,
+        help="Directory to checkpoint run state into after every agent step.",
+    )
+    parser.add_argument(
+        "--resume-run",
+        default=None,
+        help="Run directory of a failed run to continue from its last completed step.",
+    )
     return parser.parse_args()
 
 
 def main() -> None:
     args = parse_args()
+    profiler = StageProfiler(args.profile_dir) if args.profile else DISABLED_PROFILER
 
     try:
         settings = load_settings(args.config)
@@ -88,45 +134,87 @@ def main() -> None:
         if not job_description:
             raise ValueError("Job description file is empty.")
 
-        documents = load_documents(args.documents)
-        chunks = build_chunks(
-            documents=documents,
-            chunk_size=settings.chunk_size,
-            chunk_overlap=settings.chunk_overlap,
-        )
+        extraction_cache = None if args.no_extraction_cache else ExtractionCache(args.extraction_cache_dir)
+        with profiler.stage("discovery"):
+            files = discover_files(args.documents)
+        with profiler.stage("parsing"):
+            documents = parse_documents(files, cache=extraction_cache)
+        with profiler.stage("chunking"):
+            if settings.deduplicate:
+                documents = deduplicate_documents(documents, threshold=settings.dedup_threshold)
+            chunks = build_chunks(
+                documents=documents,
+                chunk_size=settings.chunk_size,
+                chunk_overlap=settings.chunk_overlap,
+            )
+            if settings.deduplicate:
+                chunks = deduplicate_chunks(chunks, threshold=settings.dedup_threshold)
         if not chunks:
             raise ValueError("No chunks were generated from candidate documents.")
 
-        vector_store = LocalVectorStore(settings.embeddings_model)
+        query_cache = None
+        if not args.no_query_cache:
+            query_cache = QueryCache(max_entries=settings.query_cache_size, path=args.query_cache)
+        vector_store = LocalVectorStore(
+            settings.embeddings_model,
+            workers=settings.embedding_workers,
+            batch_size=settings.embedding_batch_size,
+            query_cache=query_cache,
+        )
         index_base = Path(args.index_path)
 
-        if args.reuse_index:
-            try:
-                vector_store.load(index_base)
-            except VectorStoreError:
+        with profiler.stage("embedding"):
+            if args.reuse_index:
+                try:
+                    vector_store.load(index_base)
+                except VectorStoreError:
+                    vector_store.build(chunks)
+                    vector_store.save(index_base)
+            else:
                 vector_store.build(chunks)
                 vector_store.save(index_base)
-        else:
-            vector_store.build(chunks)
-            vector_store.save(index_base)
 
-        llm_client = MultiProviderLLMClient()
+        llm_client = MultiProviderLLMClient(ollama_endpoints=settings.ollama_endpoints)
         orchestrator = ResumeOrchestrator(
             settings=settings,
             vector_store=vector_store,
             intern=InternAgent(llm=llm_client, settings=settings),
             reviewer=ReviewerAgent(llm=llm_client, settings=settings),
             supervisor=SupervisorAgent(llm=llm_client, settings=settings),
+            profiler=profiler,
         )
 
-        result = orchestrator.run(job_description)
+        checkpoint = None
+        if args.resume_run:
+            checkpoint = RunCheckpoint(args.resume_run)
+            if not checkpoint.exists():
+                raise CheckpointError(f"No checkpoint found in run directory: {args.resume_run}")
+        elif args.run_dir:
+            checkpoint = RunCheckpoint(args.run_dir)
+
+        result = orchestrator.run(
+            job_description,
+            checkpoint=checkpoint,
+            resume=bool(args.resume_run),
+        )
+        if query_cache is not None:
+            query_cache.save()
+            result.stats["query_cache"] = dict(query_cache.stats)
+        if extraction_cache is not None:
+            result.stats["extraction_cache"] = dict(extraction_cache.stats)
+        result.stats["llm_calls"] = llm_client.call_log
         _write_outputs(args.output, args.report_output, result)
 
         print(f"Final resume written to: {Path(args.output).resolve()}")
         print(f"Run report written to: {Path(args.report_output).resolve()}")
 
-    except (ConfigError, DocumentLoadError, VectorStoreError, LLMClientError, ValueError) as exc:
+    except (ConfigError, CheckpointError, DocumentLoadError, VectorStoreError, LLMClientError, ValueError) as exc:
         raise SystemExit(f"Error: {exc}") from exc
+    finally:
+        # Written even when a stage fails, since slow or failing runs are what profiling is for.
+        summary_path = profiler.write_summary()
+        if summary_path is not None:
+            print(f"Profile summary written to: {summary_path.resolve()}")
 
 
 def _write_outputs(resume_path: str, report_path: str, result) -> None:
@@ -147,10 +235,12 @@ def _write_outputs(resume_path: str, report_path: str, result) -> None:
                 "score": hit.score,
                 "chunk_id": hit.chunk.chunk_id,
                 "source": hit.chunk.source,
+                "duplicate_sources": hit.chunk.duplicate_sources,
                 "text": hit.chunk.text,
             }
             for hit in result.retrieval_hits
         ],
+        "stats": result.stats,
     }
     report_target.write_text(json.dumps(report, indent=2), encoding="utf-8")
 
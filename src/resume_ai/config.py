@@ -6,20 +6,48 @@ from pathlib import Path
 import yaml
 
 
+DRAFT_MODES = {"single", "sections"}
+
+
 @dataclass
 class AgentLLMConfig:
     provider: str
     model: str
     temperature: float = 0.2
+    num_ctx: int | None = None
+    keep_alive: str | float | None = None
+
+
+@dataclass
+class OllamaEndpointConfig:
+    url: str
+    max_concurrency: int = 1
+    models: list[str] = field(default_factory=list)
+
+
+@dataclass
+class SupervisorPolicyConfig:
+    enabled: bool = True
+    min_accept_score: float = 7.5
+    auto_accept_score: float = 8.0
+    auto_accept_max_risks: int = 0
 
 
 @dataclass
 class Settings:
     embeddings_model: str = "BAAI/bge-small-en-v1.5"
+    embedding_workers: int = 1
+    embedding_batch_size: int = 64
     chunk_size: int = 1200
     chunk_overlap: int = 200
     top_k: int = 8
+    deduplicate: bool = True
+    dedup_threshold: float = 0.85
+    query_cache_size: int = 256
     max_revision_rounds: int = 2
+    draft_mode: str = "single"
+    section_top_k: int = 4
+    json_max_retries: int = 1
     supervisor: AgentLLMConfig = field(
         default_factory=lambda: AgentLLMConfig(provider="ollama", model="qwen2.5:14b", temperature=0.1)
     )
@@ -29,6 +57,8 @@ class Settings:
     reviewer: AgentLLMConfig = field(
         default_factory=lambda: AgentLLMConfig(provider="ollama", model="deepseek-r1:14b", temperature=0.1)
     )
+    supervisor_policy: SupervisorPolicyConfig = field(default_factory=SupervisorPolicyConfig)
+    ollama_endpoints: list[OllamaEndpointConfig] = field(default_factory=list)
 
 
 class ConfigError(ValueError):
@@ -43,13 +73,84 @@ def _load_agent(section_name: str, data: dict, default: AgentLLMConfig) -> Agent
     provider = str(section.get("provider", default.provider)).strip()
     model = str(section.get("model", default.model)).strip()
     temperature = float(section.get("temperature", default.temperature))
+    num_ctx = section.get("num_ctx", default.num_ctx)
+    num_ctx = int(num_ctx) if num_ctx is not None else None
+    keep_alive = section.get("keep_alive", default.keep_alive)
+    # Ollama reads strings as durations ("30m") and numbers as seconds (-1 keeps the model loaded).
+    if isinstance(keep_alive, str):
+        keep_alive = keep_alive.strip() or None
 
     if not provider:
         raise ConfigError(f"`{section_name}.provider` cannot be empty.")
     if not model:
         raise ConfigError(f"`{section_name}.model` cannot be empty.")
+    if num_ctx is not None and num_ctx <= 0:
+        raise ConfigError(f"`{section_name}.num_ctx` must be greater than 0.")
+    if keep_alive is not None and (isinstance(keep_alive, bool) or not isinstance(keep_alive, (str, int, float))):
+        raise ConfigError(f"`{section_name}.keep_alive` must be a duration string or a number of seconds.")
+
+    return AgentLLMConfig(
+        provider=provider,
+        model=model,
+        temperature=temperature,
+        num_ctx=num_ctx,
+        keep_alive=keep_alive,
+    )
+
+
+def _load_supervisor_policy(data: dict, default: SupervisorPolicyConfig) -> SupervisorPolicyConfig:
+    section = data.get("supervisor_policy", {})
+    if not isinstance(section, dict):
+        raise ConfigError("`supervisor_policy` must be a mapping in config.")
+
+    policy = SupervisorPolicyConfig(
+        enabled=bool(section.get("enabled", default.enabled)),
+        min_accept_score=float(section.get("min_accept_score", default.min_accept_score)),
+        auto_accept_score=float(section.get("auto_accept_score", default.auto_accept_score)),
+        auto_accept_max_risks=int(section.get("auto_accept_max_risks", default.auto_accept_max_risks)),
+    )
 
-    return AgentLLMConfig(provider=provider, model=model, temperature=temperature)
+    if not 0.0 <= policy.min_accept_score <= 10.0:
+        raise ConfigError("`supervisor_policy.min_accept_score` must be between 0 and 10.")
+    if policy.auto_accept_score < policy.min_accept_score:
+        raise ConfigError("`supervisor_policy.auto_accept_score` cannot be below `min_accept_score`.")
+    if policy.auto_accept_max_risks < 0:
+        raise ConfigError("`supervisor_policy.auto_accept_max_risks` cannot be negative.")
+
+    return policy
+
+
+def _load_endpoints(data: dict) -> list[OllamaEndpointConfig]:
+    section = data.get("ollama_endpoints", [])
+    if not isinstance(section, list):
+        raise ConfigError("`ollama_endpoints` must be a list in config.")
+
+    endpoints: list[OllamaEndpointConfig] = []
+    for i, item in enumerate(section):
+        if isinstance(item, str):
+            item = {"url": item}
+        if not isinstance(item, dict):
+            raise ConfigError(f"`ollama_endpoints[{i}]` must be a URL or a mapping.")
+
+        url = str(item.get("url", "")).strip()
+        max_concurrency = int(item.get("max_concurrency", 1))
+        models = item.get("models", [])
+
+        if not url:
+            raise ConfigError(f"`ollama_endpoints[{i}].url` cannot be empty.")
+        if max_concurrency <= 0:
+            raise ConfigError(f"`ollama_endpoints[{i}].max_concurrency` must be greater than 0.")
+        if not isinstance(models, list):
+            raise ConfigError(f"`ollama_endpoints[{i}].models` must be a list.")
+
+        endpoints.append(
+            OllamaEndpointConfig(
+                url=url,
+                max_concurrency=max_concurrency,
+                models=[str(model).strip() for model in models if str(model).strip()],
+            )
+        )
+    return endpoints
 
 
 def load_settings(path: str | Path | None = None) -> Settings:
@@ -68,15 +169,29 @@ def load_settings(path: str | Path | None = None) -> Settings:
         raise ConfigError("Config file root must be a mapping.")
 
     settings.embeddings_model = str(raw.get("embeddings_model", settings.embeddings_model))
+    settings.embedding_workers = int(raw.get("embedding_workers", settings.embedding_workers))
+    settings.embedding_batch_size = int(raw.get("embedding_batch_size", settings.embedding_batch_size))
     settings.chunk_size = int(raw.get("chunk_size", settings.chunk_size))
     settings.chunk_overlap = int(raw.get("chunk_overlap", settings.chunk_overlap))
     settings.top_k = int(raw.get("top_k", settings.top_k))
+    settings.deduplicate = bool(raw.get("deduplicate", settings.deduplicate))
+    settings.dedup_threshold = float(raw.get("dedup_threshold", settings.dedup_threshold))
+    settings.query_cache_size = int(raw.get("query_cache_size", settings.query_cache_size))
     settings.max_revision_rounds = int(raw.get("max_revision_rounds", settings.max_revision_rounds))
+    settings.draft_mode = str(raw.get("draft_mode", settings.draft_mode)).strip().lower()
+    settings.section_top_k = int(raw.get("section_top_k", settings.section_top_k))
+    settings.json_max_retries = int(raw.get("json_max_retries", settings.json_max_retries))
 
     settings.supervisor = _load_agent("supervisor", raw, settings.supervisor)
     settings.intern = _load_agent("intern", raw, settings.intern)
     settings.reviewer = _load_agent("reviewer", raw, settings.reviewer)
+    settings.supervisor_policy = _load_supervisor_policy(raw, settings.supervisor_policy)
+    settings.ollama_endpoints = _load_endpoints(raw)
 
+    if settings.embedding_workers < 0:
+        raise ConfigError("`embedding_workers` cannot be negative (use 0 for one per CPU core).")
+    if settings.embedding_batch_size <= 0:
+        raise ConfigError("`embedding_batch_size` must be greater than 0.")
     if settings.chunk_size <= 0:
         raise ConfigError("`chunk_size` must be greater than 0.")
     if settings.chunk_overlap < 0:
@@ -85,7 +200,17 @@ def load_settings(path: str | Path | None = None) -> Settings:
         raise ConfigError("`chunk_overlap` must be smaller than `chunk_size`.")
     if settings.top_k <= 0:
         raise ConfigError("`top_k` must be greater than 0.")
+    if not 0.0 < settings.dedup_threshold <= 1.0:
+        raise ConfigError("`dedup_threshold` must be in (0, 1].")
+    if settings.query_cache_size <= 0:
+        raise ConfigError("`query_cache_size` must be greater than 0.")
     if settings.max_revision_rounds <= 0:
         raise ConfigError("`max_revision_rounds` must be greater than 0.")
+    if settings.draft_mode not in DRAFT_MODES:
+        raise ConfigError(f"`draft_mode` must be one of: {', '.join(sorted(DRAFT_MODES))}.")
+    if settings.section_top_k <= 0:
+        raise ConfigError("`section_top_k` must be greater than 0.")
+    if settings.json_max_retries < 0:
+        raise ConfigError("`json_max_retries` cannot be negative.")
 
     return settings
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import re
+import zlib
+from collections import defaultdict
+
+import numpy as np
+
+from .chunking import ChunkTable
+from .types import Document
+
+
+NUM_PERMUTATIONS = 128
+SHINGLE_SIZE = 3
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_WORD_PATTERN = re.compile(r"\w+")
+
+_rng = np.random.default_rng(1)
+# Coefficients stay below 2**31 so a * shingle (< 2**32) + b cannot overflow uint64.
+_PERM_A = _rng.integers(1, 1 << 31, size=NUM_PERMUTATIONS, dtype=np.uint64)
+_PERM_B = _rng.integers(0, 1 << 31, size=NUM_PERMUTATIONS, dtype=np.uint64)
+
+
+def deduplicate_documents(documents: list[Document], threshold: float) -> list[Document]:
+    """Collapse near-identical documents, keeping the longest and recording the others' sources.
+
+    Input documents are not modified; kept documents that absorbed duplicates are returned as copies.
+    """
+    longest_first = sorted(range(len(documents)), key=lambda i: -len(documents[i].text))
+    clusters = find_near_duplicates([doc.text for doc in documents], threshold, order=longest_first)
+
+    replaced: dict[int, Document] = {}
+    dropped: set[int] = set()
+    for keep, *others in clusters:
+        kept = documents[keep]
+        duplicate_sources = list(kept.duplicate_sources)
+        for i in others:
+            duplicate_sources.extend([documents[i].source, *documents[i].duplicate_sources])
+            dropped.add(i)
+        replaced[keep] = Document(source=kept.source, text=kept.text, duplicate_sources=duplicate_sources)
+
+    return [replaced.get(i, doc) for i, doc in enumerate(documents) if i not in dropped]
+
+
+def deduplicate_chunks(table: ChunkTable, threshold: float) -> ChunkTable:
+    """Collapse near-identical chunks into the first one, merging the provenance of the rest."""
+    clusters = find_near_duplicates(list(table.iter_texts()), threshold)
+    if not clusters:
+        return table
+
+    duplicates = {i: list(sources) for i, sources in table.duplicates.items()}
+    dropped: set[int] = set()
+    for keep, *others in clusters:
+        keep_source = table.sources[int(table.doc_indices[keep])]
+        merged = duplicates.setdefault(keep, [])
+        for i in others:
+            source = table.sources[int(table.doc_indices[i])]
+            for item in [source, *duplicates.get(i, [])]:
+                if item != keep_source and item not in merged:
+                    merged.append(item)
+            dropped.add(i)
+
+    keep_indices = [i for i in range(len(table)) if i not in dropped]
+    return table.subset(keep_indices, duplicates)
+
+
+def find_near_duplicates(
+    texts: list[str],
+    threshold: float,
+    order: list[int] | None = None,
+) -> list[list[int]]:
+    """Group texts whose estimated Jaccard similarity to a kept representative is at least `threshold`.
+
+    Uses MinHash signatures with LSH banding, so only texts sharing a band
+    bucket are compared. Texts are visited in `order` (default: input order);
+    each one not yet claimed becomes a representative and claims the unclaimed
+    candidates that are similar to it. Membership is never transitive, so a
+    chain of small edits cannot pull in texts far from the representative.
+    Returns clusters of two or more indices, representative first.
+    """
+    if len(texts) < 2:
+        return []
+
+    signatures = np.stack([_minhash(text) for text in texts])
+    bands, rows = _lsh_shape(threshold)
+    order = list(range(len(texts))) if order is None else order
+    rank = np.empty(len(texts), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+
+    buckets: list[list[int]] = []
+    item_buckets: list[list[int]] = [[] for _ in texts]
+    for band in range(bands):
+        band_buckets: dict[bytes, list[int]] = defaultdict(list)
+        band_slice = signatures[:, band * rows : (band + 1) * rows]
+        for i in range(len(texts)):
+            band_buckets[band_slice[i].tobytes()].append(i)
+        for members in band_buckets.values():
+            if len(members) < 2:
+                continue
+            for i in members:
+                item_buckets[i].append(len(buckets))
+            buckets.append(members)
+
+    claimed = np.zeros(len(texts), dtype=bool)
+    clusters: list[list[int]] = []
+    for head in order:
+        if claimed[head]:
+            continue
+        claimed[head] = True
+        candidates = {i for bucket in item_buckets[head] for i in buckets[bucket] if not claimed[i]}
+        if not candidates:
+            continue
+        candidates_array = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        similarity = np.mean(signatures[candidates_array] == signatures[head], axis=1)
+        members = candidates_array[similarity >= threshold]
+        if members.size == 0:
+            continue
+        members = members[np.argsort(rank[members])]
+        claimed[members] = True
+        clusters.append([head, *members.tolist()])
+    return clusters
+
+
+def _minhash(text: str) -> np.ndarray:
+    shingles = _shingles(text)
+    if shingles.size == 0:
+        return np.full(NUM_PERMUTATIONS, _MAX_HASH, dtype=np.uint64)
+    hashed = (_PERM_A[:, None] * shingles[None, :] + _PERM_B[:, None]) % _MERSENNE_PRIME
+    return (hashed & _MAX_HASH).min(axis=1)
+
+
+def _shingles(text: str) -> np.ndarray:
+    words = _WORD_PATTERN.findall(text.lower())
+    if len(words) < SHINGLE_SIZE:
+        grams = [" ".join(words)] if words else []
+    else:
+        grams = [" ".join(words[i : i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)]
+    return np.unique(np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams)))
+
+
+def _lsh_shape(threshold: float) -> tuple[int, int]:
+    # Pick the most selective banding whose S-curve midpoint, (1/b)^(1/r), sits safely
+    # below the threshold; candidates are then verified against the full signature.
+    best = (NUM_PERMUTATIONS, 1)
+    rows = 1
+    while rows <= NUM_PERMUTATIONS:
+        if NUM_PERMUTATIONS % rows == 0:
+            bands = NUM_PERMUTATIONS // rows
+            if (1 / bands) ** (1 / rows) <= threshold - 0.1:
+                best = (bands, rows)
+        rows *= 2
+    return best
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+import sys
 from pathlib import Path
 
 from docx import Document as DocxDocument
 from pypdf import PdfReader
 
+from .extraction_cache import ExtractionCache
 from .types import Document
 
 
@@ -67,13 +69,30 @@ def read_file_text(path: str | Path) -> str:
     raise DocumentLoadError(f"Unsupported file type: {target}")
 
 
-def load_documents(inputs: list[str | Path]) -> list[Document]:
+def load_documents(
+    inputs: list[str | Path],
+    cache: ExtractionCache | None = None,
+) -> list[Document]:
+    return parse_documents(discover_files(inputs), cache=cache)
+
+
+def parse_documents(
+    files: list[Path],
+    cache: ExtractionCache | None = None,
+) -> list[Document]:
+    """Extract text from already discovered files, skipping files with no content."""
     documents: list[Document] = []
-    for path in discover_files(inputs):
-        text = read_file_text(path).strip()
+    for path in files:
+        if cache is not None and cache.handles(path):
+            text = cache.read(path, _extract_text)
+        else:
+            text = _extract_text(path)
         if not text:
             continue
-        documents.append(Document(source=str(path), text=text))
+        documents.append(Document(source=sys.intern(str(path)), text=text))
+
+    if cache is not None:
+        cache.save()
 
     if not documents:
         raise DocumentLoadError("No readable content found in supported files.")
@@ -81,6 +100,10 @@ def load_documents(inputs: list[str | Path]) -> list[Document]:
     return documents
 
 
+def _extract_text(path: Path) -> str:
+    return read_file_text(path).strip()
+
+
 def _read_pdf(path: Path) -> str:
     reader = PdfReader(str(path))
     pages: list[str] = []
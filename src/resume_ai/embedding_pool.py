@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import multiprocessing as mp
+import os
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+
+# Shards per worker; more shards than workers keeps the pool busy when shard costs differ.
+SHARDS_PER_WORKER = 4
+# Each worker imports torch and loads its own model copy, which only pays off for this many texts.
+MIN_TEXTS_PER_WORKER = 256
+
+_worker_encoder: SentenceTransformer | None = None
+_worker_batch_size = 64
+
+
+def resolve_worker_count(workers: int, text_count: int | None = None) -> int:
+    """Worker processes to use; with `text_count`, capped so each worker gets enough texts."""
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    if text_count is not None:
+        workers = min(workers, text_count // MIN_TEXTS_PER_WORKER)
+    return max(workers, 1)
+
+
+def encode_texts(
+    encoder: SentenceTransformer,
+    texts: list[str],
+    batch_size: int,
+) -> np.ndarray:
+    return encoder.encode(
+        texts,
+        batch_size=batch_size,
+        normalize_embeddings=True,
+        convert_to_numpy=True,
+        show_progress_bar=False,
+    ).astype(np.float32)
+
+
+def encode_parallel(
+    model_name: str,
+    texts: list[str],
+    workers: int,
+    batch_size: int,
+) -> np.ndarray:
+    """Encode `texts` across a process pool and return embeddings in input order.
+
+    Texts are sorted by length so each shard (and each batch inside it) holds
+    similarly sized inputs, which keeps padding to a minimum.
+    """
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    workers = resolve_worker_count(workers, len(texts))
+    shard_count = min(len(texts), workers * SHARDS_PER_WORKER)
+    bounds = np.linspace(0, len(order), shard_count + 1, dtype=int)
+    shards = [order[bounds[i] : bounds[i + 1]] for i in range(shard_count)]
+
+    threads_per_worker = max(1, (os.cpu_count() or 1) // workers)
+    # Spawn rather than fork: torch thread pools are not fork-safe.
+    context = mp.get_context("spawn")
+    with context.Pool(
+        processes=workers,
+        initializer=_init_worker,
+        initargs=(model_name, batch_size, threads_per_worker),
+    ) as pool:
+        results = pool.map(_encode_shard, [[texts[i] for i in shard] for shard in shards])
+
+    dimension = results[0].shape[1]
+    embeddings = np.empty((len(texts), dimension), dtype=np.float32)
+    for shard, shard_embeddings in zip(shards, results):
+        embeddings[shard] = shard_embeddings
+    return embeddings
+
+
+def _init_worker(model_name: str, batch_size: int, threads: int) -> None:
+    global _worker_encoder, _worker_batch_size
+
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    torch.set_num_threads(threads)
+    _worker_encoder = SentenceTransformer(model_name, device="cpu")
+    _worker_batch_size = batch_size
+
+
+def _encode_shard(texts: list[str]) -> np.ndarray:
+    assert _worker_encoder is not None
+    return encode_texts(_worker_encoder, texts, _worker_batch_size)
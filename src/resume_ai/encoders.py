@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import re
+import zlib
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .embedding_pool import encode_parallel, encode_texts, resolve_worker_count
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+
+HASHING_PREFIX = "hashing"
+DEFAULT_HASHING_DIM = 2048
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9+#]+)*")
+
+
+class Encoder(ABC):
+    """Turns texts into L2-normalized float32 embeddings.
+
+    `encode_corpus` is used when building an index and may fit state that is
+    persisted alongside it via `state` / `load_state`; `encode` embeds queries.
+    """
+
+    name: str
+
+    def encode_corpus(self, texts: list[str], batch_size: int, workers: int) -> np.ndarray:
+        return self.encode(texts, batch_size=batch_size)
+
+    @abstractmethod
+    def encode(self, texts: list[str], batch_size: int) -> np.ndarray:
+        ...
+
+    def fingerprint(self) -> str:
+        """Identify everything a query embedding depends on, for caching."""
+        return self.name
+
+    def state(self) -> dict[str, np.ndarray]:
+        return {}
+
+    def load_state(self, arrays: dict[str, np.ndarray]) -> None:
+        return None
+
+
+class SentenceTransformerEncoder(Encoder):
+    def __init__(self, model_name: str) -> None:
+        self.name = model_name
+        self._model: SentenceTransformer | None = None
+
+    @property
+    def model(self) -> SentenceTransformer:
+        # Loading the model takes seconds, so defer it until something is encoded.
+        if self._model is None:
+            try:
+                from sentence_transformers import SentenceTransformer
+            except ImportError as exc:
+                raise ImportError(
+                    f"Embedding model `{self.name}` needs sentence-transformers; "
+                    'install it with `pip install -e ".[embeddings]"` or use `embeddings_model: hashing`.'
+                ) from exc
+
+            self._model = SentenceTransformer(self.name)
+        return self._model
+
+    def encode_corpus(self, texts: list[str], batch_size: int, workers: int) -> np.ndarray:
+        if resolve_worker_count(workers, len(texts)) > 1:
+            return encode_parallel(self.name, texts, workers=workers, batch_size=batch_size)
+        return self.encode(texts, batch_size=batch_size)
+
+    def encode(self, texts: list[str], batch_size: int) -> np.ndarray:
+        return encode_texts(self.model, texts, batch_size=batch_size)
+
+
+class HashingEncoder(Encoder):
+    """Model-free TF-IDF over signed feature-hashed unigrams and bigrams, in pure NumPy.
+
+    IDF weights are fitted on the indexed corpus and saved with the index.
+    """
+
+    def __init__(self, dim: int = DEFAULT_HASHING_DIM) -> None:
+        if dim <= 0:
+            raise ValueError("Hashing encoder dimension must be greater than 0.")
+        self.dim = dim
+        self.name = f"{HASHING_PREFIX}:{dim}"
+        self._idf = np.ones(dim, dtype=np.float32)
+
+    def encode_corpus(self, texts: list[str], batch_size: int, workers: int) -> np.ndarray:
+        counts = [self._hashed_counts(text) for text in texts]
+        document_frequency = np.zeros(self.dim, dtype=np.float32)
+        for row in counts:
+            document_frequency[np.fromiter((abs(f) - 1 for f in row), dtype=np.int64, count=len(row))] += 1
+        self._idf = (np.log((1 + len(texts)) / (1 + document_frequency)) + 1).astype(np.float32)
+        return self._vectorize(counts)
+
+    def encode(self, texts: list[str], batch_size: int) -> np.ndarray:
+        return self._vectorize([self._hashed_counts(text) for text in texts])
+
+    def fingerprint(self) -> str:
+        return f"{self.name}:{hashlib.blake2b(self._idf.tobytes(), digest_size=16).hexdigest()}"
+
+    def state(self) -> dict[str, np.ndarray]:
+        return {"idf": self._idf}
+
+    def load_state(self, arrays: dict[str, np.ndarray]) -> None:
+        idf = arrays.get("idf")
+        if idf is not None and idf.shape == (self.dim,):
+            self._idf = idf.astype(np.float32)
+
+    def _vectorize(self, counts: list[Counter]) -> np.ndarray:
+        matrix = np.zeros((len(counts), self.dim), dtype=np.float32)
+        for i, row in enumerate(counts):
+            for feature, count in row.items():
+                bucket = abs(feature) - 1
+                sign = 1.0 if feature > 0 else -1.0
+                matrix[i, bucket] += sign * (1.0 + math.log(count)) * self._idf[bucket]
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def _hashed_counts(self, text: str) -> Counter:
+        tokens = _TOKEN_PATTERN.findall(text.lower())
+        terms = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        return Counter(self._feature(term) for term in terms)
+
+    def _feature(self, term: str) -> int:
+        # Signed bucket id: abs() - 1 is the bucket and the sign halves collision bias.
+        # crc32 is cheap enough that memoizing terms costs more memory than it saves time.
+        digest = zlib.crc32(term.encode("utf-8"))
+        bucket = (digest >> 1) % self.dim + 1
+        return bucket if digest & 1 else -bucket
+
+
+def create_encoder(name: str) -> Encoder:
+    """Build the encoder named by `embeddings_model`: `hashing[:dim]` or a SentenceTransformer model."""
+    if name == HASHING_PREFIX or name.startswith(f"{HASHING_PREFIX}:"):
+        _, _, dim = name.partition(":")
+        try:
+            return HashingEncoder(int(dim) if dim else DEFAULT_HASHING_DIM)
+        except ValueError as exc:
+            raise ValueError(f"Invalid hashing encoder spec `{name}`; use `hashing` or `hashing:<dim>`.") from exc
+    return SentenceTransformerEncoder(name)
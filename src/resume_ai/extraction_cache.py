@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from collections.abc import Callable
+from pathlib import Path
+
+
+# Bump when PDF/DOCX extraction changes so stale cached text is re-parsed.
+EXTRACTOR_VERSION = 1
+CACHED_EXTENSIONS = {".pdf", ".docx"}
+
+_INDEX_FILENAME = "index.json"
+_HASH_BLOCK_SIZE = 1 << 20
+
+
+class ExtractionCache:
+    """Persistent cache of text extracted from PDF and DOCX files.
+
+    Entries are keyed by resolved path, size and mtime; when those change the
+    file is hashed and text is reused if the content itself is unchanged.
+    Text is stored once per content hash under `texts/`; blobs no entry
+    refers to any more are removed on `save`.
+    """
+
+    def __init__(self, cache_dir: str | Path) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.texts_dir = self.cache_dir / "texts"
+        self.index_path = self.cache_dir / _INDEX_FILENAME
+        self.stats = {"hits": 0, "misses": 0}
+        self._entries = self._load_index()
+        self._dirty = False
+
+    def handles(self, path: Path) -> bool:
+        return path.suffix.lower() in CACHED_EXTENSIONS
+
+    def read(self, path: Path, extract: Callable[[Path], str]) -> str:
+        stat = path.stat()
+        key = str(path)
+        entry = self._entries.get(key)
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            text = self._read_text(entry["sha256"])
+            if text is not None:
+                self.stats["hits"] += 1
+                return text
+
+        digest = _file_sha256(path)
+        text = self._read_text(digest)
+        if text is None:
+            self.stats["misses"] += 1
+            text = extract(path)
+            self.texts_dir.mkdir(parents=True, exist_ok=True)
+            _atomic_write(self.texts_dir / f"{digest}.txt", text)
+        else:
+            self.stats["hits"] += 1
+
+        self._entries[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}
+        self._dirty = True
+        return text
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        payload = {"extractor_version": EXTRACTOR_VERSION, "entries": self._entries}
+        _atomic_write(self.index_path, json.dumps(payload))
+        self._dirty = False
+        self._prune_texts()
+
+    def _prune_texts(self) -> None:
+        referenced = {f"{entry['sha256']}.txt" for entry in self._entries.values()}
+        if not self.texts_dir.is_dir():
+            return
+        for blob in self.texts_dir.glob("*.txt"):
+            if blob.name not in referenced:
+                blob.unlink(missing_ok=True)
+
+    def _load_index(self) -> dict[str, dict]:
+        try:
+            payload = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        if payload.get("extractor_version") != EXTRACTOR_VERSION:
+            return {}
+        return dict(payload.get("entries", {}))
+
+    def _read_text(self, digest: str) -> str | None:
+        try:
+            return (self.texts_dir / f"{digest}.txt").read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    digest.update(str(EXTRACTOR_VERSION).encode("ascii"))
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _atomic_write(target: Path, text: str) -> None:
+    tmp_path = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(text, encoding="utf-8")
+    os.replace(tmp_path, target)
@@ -1,10 +1,10 @@
 from __future__ import annotations
 
 import os
+from typing import Any
 
-from ollama import Client
-
-from .config import AgentLLMConfig
+from .config import AgentLLMConfig, OllamaEndpointConfig
+from .ollama_router import OllamaRouter
 
 
 class LLMClientError(RuntimeError):
@@ -12,39 +12,88 @@ class LLMClientError(RuntimeError):
 
 
 class MultiProviderLLMClient:
-    """A minimal provider router. Currently supports local Ollama models."""
+    """A minimal provider router. Currently supports Ollama models on one or more hosts."""
 
-    def __init__(self) -> None:
-        self._ollama_client = Client(host=os.getenv("OLLAMA_BASE_URL", "http://localhost:11434"))
+    def __init__(self, ollama_endpoints: list[OllamaEndpointConfig] | None = None) -> None:
+        if not ollama_endpoints:
+            # A single local host; allow the parallelism Ollama usually serves by default.
+            ollama_endpoints = [
+                OllamaEndpointConfig(
+                    url=os.getenv("OLLAMA_BASE_URL", "http://localhost:11434"),
+                    max_concurrency=4,
+                )
+            ]
+        self._ollama_router = OllamaRouter(ollama_endpoints)
+        self.call_log: list[dict[str, Any]] = []
 
-    def chat(self, system_prompt: str, user_prompt: str, config: AgentLLMConfig) -> str:
+    def chat(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        config: AgentLLMConfig,
+        response_schema: dict[str, Any] | None = None,
+        label: str = "",
+    ) -> str:
         provider = config.provider.lower().strip()
         if provider == "ollama":
-            return self._chat_ollama(system_prompt, user_prompt, config)
+            return self._chat_ollama(system_prompt, user_prompt, config, response_schema, label)
 
         raise LLMClientError(
             f"Provider `{config.provider}` is not supported in this starter project. "
             "Use `ollama` or extend MultiProviderLLMClient."
         )
 
-    def _chat_ollama(self, system_prompt: str, user_prompt: str, config: AgentLLMConfig) -> str:
+    def _chat_ollama(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        config: AgentLLMConfig,
+        response_schema: dict[str, Any] | None = None,
+        label: str = "",
+    ) -> str:
+        options: dict[str, Any] = {"temperature": config.temperature}
+        if config.num_ctx is not None:
+            # A fixed context size keeps Ollama from reloading the model, which would drop its prompt cache.
+            options["num_ctx"] = config.num_ctx
+        request: dict[str, Any] = {
+            "model": config.model,
+            "options": options,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+        }
+        if config.keep_alive is not None:
+            request["keep_alive"] = config.keep_alive
+        if response_schema is not None:
+            # Ollama constrains decoding to the JSON schema passed as `format`.
+            request["format"] = response_schema
+
         try:
-            response = self._ollama_client.chat(
-                model=config.model,
-                options={"temperature": config.temperature},
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-            )
+            response = self._ollama_router.chat(**request)
         except Exception as exc:  # noqa: BLE001
             raise LLMClientError(
                 f"Ollama request failed for model `{config.model}`. "
                 "Make sure `ollama serve` is running and the model is pulled."
             ) from exc
 
+        self.call_log.append(
+            {
+                "label": label,
+                "model": config.model,
+                "prompt_eval_count": response.get("prompt_eval_count"),
+                "eval_count": response.get("eval_count"),
+                "prompt_eval_ms": _nanoseconds_to_ms(response.get("prompt_eval_duration")),
+                "total_ms": _nanoseconds_to_ms(response.get("total_duration")),
+            }
+        )
+
         message = response.get("message", {})
         content = message.get("content", "")
         if not content:
             raise LLMClientError(f"Model `{config.model}` returned an empty response.")
         return content.strip()
+
+
+def _nanoseconds_to_ms(value: int | None) -> float | None:
+    return round(value / 1e6, 1) if value is not None else None
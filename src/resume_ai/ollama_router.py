@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from ollama import Client, ResponseError
+
+from .config import OllamaEndpointConfig
+
+
+# Seconds an endpoint that failed is kept out of rotation before it is health-checked again.
+FAILURE_COOLDOWN_SECONDS = 30.0
+# Interval of the background health check that runs when a pool has more than one endpoint.
+HEALTH_CHECK_INTERVAL_SECONDS = 15.0
+
+
+class NoEndpointAvailableError(RuntimeError):
+    """Raised when no healthy endpoint can serve a model."""
+
+
+@dataclass
+class _Endpoint:
+    config: OllamaEndpointConfig
+    client: Client
+    outstanding: int = 0
+    healthy: bool = True
+    failed_at: float = 0.0
+    stats: dict[str, int] = field(default_factory=lambda: {"requests": 0, "failures": 0})
+
+    def serves(self, model: str) -> bool:
+        return not self.config.models or model in self.config.models
+
+
+class OllamaRouter:
+    """Routes chat requests across a pool of Ollama hosts.
+
+    Requests go to the healthy endpoint with the fewest outstanding requests
+    that is below its concurrency cap; callers wait when every eligible
+    endpoint is saturated. A failing endpoint is taken out of rotation and the
+    request fails over to the next one; when every eligible endpoint is marked
+    unhealthy they are tried anyway, so a transient error on the only host
+    never blocks later calls.
+    """
+
+    def __init__(
+        self,
+        endpoints: list[OllamaEndpointConfig],
+        health_check_interval: float | None = HEALTH_CHECK_INTERVAL_SECONDS,
+    ) -> None:
+        if not endpoints:
+            raise ValueError("OllamaRouter needs at least one endpoint.")
+        self._endpoints = [_Endpoint(config=item, client=Client(host=item.url)) for item in endpoints]
+        self._condition = threading.Condition()
+        self._closed = threading.Event()
+        if health_check_interval and len(self._endpoints) > 1:
+            threading.Thread(
+                target=self._health_check_loop,
+                args=(health_check_interval,),
+                name="ollama-health-check",
+                daemon=True,
+            ).start()
+
+    def close(self) -> None:
+        self._closed.set()
+
+    def chat(self, **request: Any) -> Any:
+        model = request["model"]
+        tried: set[str] = set()
+        last_error: Exception | None = None
+
+        while True:
+            endpoint = self._acquire(model, exclude=tried)
+            if endpoint is None:
+                if last_error is not None:
+                    raise last_error
+                raise NoEndpointAvailableError(f"No healthy Ollama endpoint serves model `{model}`.")
+
+            tried.add(endpoint.config.url)
+            try:
+                response = endpoint.client.chat(**request)
+            except Exception as exc:  # noqa: BLE001
+                last_error = exc
+                self._release(endpoint, failed=_is_endpoint_failure(exc))
+                continue
+
+            self._release(endpoint, failed=False)
+            return response
+
+    def check_health(self) -> dict[str, bool]:
+        """Probe every endpoint and update its health; returns url -> healthy."""
+        results: dict[str, bool] = {}
+        for endpoint in self._endpoints:
+            healthy = _probe(endpoint)
+            with self._condition:
+                endpoint.healthy = healthy
+                if not healthy:
+                    endpoint.failed_at = time.monotonic()
+                self._condition.notify_all()
+            results[endpoint.config.url] = healthy
+        return results
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        with self._condition:
+            return {
+                endpoint.config.url: {
+                    **endpoint.stats,
+                    "outstanding": endpoint.outstanding,
+                    "healthy": endpoint.healthy,
+                }
+                for endpoint in self._endpoints
+            }
+
+    def _acquire(self, model: str, exclude: set[str]) -> _Endpoint | None:
+        candidates = [
+            endpoint
+            for endpoint in self._endpoints
+            if endpoint.serves(model) and endpoint.config.url not in exclude
+        ]
+        self._revive(candidates)
+
+        with self._condition:
+            while True:
+                if not candidates:
+                    return None
+                live = [endpoint for endpoint in candidates if endpoint.healthy] or candidates
+                free = [endpoint for endpoint in live if endpoint.outstanding < endpoint.config.max_concurrency]
+                if free:
+                    chosen = min(free, key=lambda endpoint: endpoint.outstanding)
+                    chosen.outstanding += 1
+                    chosen.stats["requests"] += 1
+                    return chosen
+                self._condition.wait()
+
+    def _release(self, endpoint: _Endpoint, failed: bool) -> None:
+        with self._condition:
+            endpoint.outstanding -= 1
+            if failed:
+                endpoint.healthy = False
+                endpoint.failed_at = time.monotonic()
+                endpoint.stats["failures"] += 1
+            else:
+                endpoint.healthy = True
+            self._condition.notify_all()
+
+    def _health_check_loop(self, interval: float) -> None:
+        while not self._closed.wait(interval):
+            self.check_health()
+
+    def _revive(self, candidates: list[_Endpoint]) -> None:
+        now = time.monotonic()
+        for endpoint in candidates:
+            if endpoint.healthy or now - endpoint.failed_at < FAILURE_COOLDOWN_SECONDS:
+                continue
+            healthy = _probe(endpoint)
+            with self._condition:
+                endpoint.healthy = healthy
+                endpoint.failed_at = now if not healthy else endpoint.failed_at
+                self._condition.notify_all()
+
+
+def _probe(endpoint: _Endpoint) -> bool:
+    try:
+        endpoint.client.list()
+    except Exception:  # noqa: BLE001
+        return False
+    return True
+
+
+def _is_endpoint_failure(exc: Exception) -> bool:
+    # Client errors (e.g. model not pulled on this host) fail over without evicting the host.
+    if isinstance(exc, ResponseError):
+        return exc.status_code is None or exc.status_code >= 500
+    return True
@@ -1,63 +1,266 @@
 from __future__ import annotations
 
 import json
+import re
+from collections import Counter
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
 
 from .agents import InternAgent, ReviewerAgent, SupervisorAgent
+from .checkpoint import RunCheckpoint, RunState
 from .config import Settings
-from .prompts import format_retrieval_context
-from .types import RetrievalHit, RunResult
+from .profiling import DISABLED_PROFILER, StageProfiler
+from .prompts import EMPTY_SECTION_MARKER, HEADER_HINT, RESUME_SECTIONS, format_retrieval_context
+from .types import JSONParseStats, RetrievalHit, RunResult
 from .vector_store import LocalVectorStore
 
 
+HEADER_KEY = "header"
+# Word-set Jaccard at which a bullet or subheading repeats one from an earlier section.
+SECTION_OVERLAP_THRESHOLD = 0.8
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
 class ResumeOrchestrator:
-    def __init__(self, settings: Settings, vector_store: LocalVectorStore, intern: InternAgent, reviewer: ReviewerAgent, supervisor: SupervisorAgent) -> None:
+    def __init__(
+        self,
+        settings: Settings,
+        vector_store: LocalVectorStore,
+        intern: InternAgent,
+        reviewer: ReviewerAgent,
+        supervisor: SupervisorAgent,
+        profiler: StageProfiler = DISABLED_PROFILER,
+    ) -> None:
         self.settings = settings
         self.vector_store = vector_store
         self.intern = intern
         self.reviewer = reviewer
         self.supervisor = supervisor
+        self.profiler = profiler
 
-    def run(self, job_description: str) -> RunResult:
-        hits = self.vector_store.search(job_description, top_k=self.settings.top_k)
-        context = format_retrieval_context(
-            [
-                {
-                    "source": hit.chunk.source,
-                    "text": hit.chunk.text,
-                }
-                for hit in hits
-            ]
-        )
+    def run(
+        self,
+        job_description: str,
+        checkpoint: RunCheckpoint | None = None,
+        resume: bool = False,
+    ) -> RunResult:
+        if checkpoint is not None:
+            state = checkpoint.start(job_description, resume=resume)
+        else:
+            state = RunState(job_description_sha256="")
+
+        # Counts from earlier processes of a resumed run; this process's agents start from zero.
+        carried_json_parse = dict(state.json_parse)
 
-        draft_resume = self.intern.draft(job_description=job_description, context=context)
-        current_resume = draft_resume
+        def save() -> None:
+            state.json_parse = self._json_parse_totals(carried_json_parse)
+            if checkpoint is not None:
+                checkpoint.save(state)
 
-        review_rounds = []
-        supervisor_rounds = []
+        by_section = self.settings.draft_mode == "sections"
+        section_hits: dict[str, list[RetrievalHit]] = {}
+        # Per-section hits are not checkpointed, so a section draft that has not finished re-retrieves.
+        if state.retrieval_hits is None or (by_section and state.draft_resume is None):
+            with self.profiler.stage("search"):
+                if by_section:
+                    section_hits = self._retrieve_sections(job_description)
+                    state.retrieval_hits = _merge_hits(section_hits.values())
+                else:
+                    state.retrieval_hits = self.vector_store.search(job_description, top_k=self.settings.top_k)
+            save()
+        hits = state.retrieval_hits
+        context = _format_hits(hits)
+
+        if state.draft_resume is None:
+            with self.profiler.stage("intern.draft"):
+                if by_section:
+                    state.draft_resume = self._draft_by_section(job_description, section_hits)
+                else:
+                    state.draft_resume = self.intern.draft(job_description=job_description, context=context)
+            state.current_resume = state.draft_resume
+            save()
 
         for round_number in range(1, self.settings.max_revision_rounds + 1):
-            review = self.reviewer.review(job_description=job_description, resume=current_resume)
-            review_rounds.append(review)
+            if state.completed:
+                break
 
-            decision = self.supervisor.decide(review_feedback=review, round_number=round_number)
-            supervisor_rounds.append(decision)
+            if len(state.review_rounds) < round_number:
+                with self.profiler.stage(f"reviewer.review.round{round_number}"):
+                    review = self.reviewer.review(job_description=job_description, resume=state.current_resume)
+                state.review_rounds.append(review)
+                save()
+            review = state.review_rounds[round_number - 1]
+
+            if len(state.supervisor_rounds) < round_number:
+                with self.profiler.stage(f"supervisor.decide.round{round_number}"):
+                    decision = self.supervisor.decide(review_feedback=review, round_number=round_number)
+                state.supervisor_rounds.append(decision)
+                save()
+            decision = state.supervisor_rounds[round_number - 1]
 
             if decision.action == "accept":
                 break
 
-            feedback_blob = json.dumps(review.to_dict(), indent=2)
-            current_resume = self.intern.revise(
-                job_description=job_description,
-                current_resume=current_resume,
-                review_feedback=feedback_blob,
-                supervisor_focus=decision.focus,
-                context=context,
-            )
+            if state.revised_rounds < round_number:
+                feedback_blob = json.dumps(review.to_dict(), indent=2)
+                with self.profiler.stage(f"intern.revise.round{round_number}"):
+                    state.current_resume = self.intern.revise(
+                        job_description=job_description,
+                        current_resume=state.current_resume,
+                        review_feedback=feedback_blob,
+                        supervisor_focus=decision.focus,
+                        context=context,
+                    )
+                state.revised_rounds = round_number
+                save()
+
+        if not state.completed:
+            state.completed = True
+            save()
+        json_parse = self._json_parse_totals(carried_json_parse)
 
         return RunResult(
-            final_resume=current_resume,
-            draft_resume=draft_resume,
-            review_rounds=review_rounds,
-            supervisor_rounds=supervisor_rounds,
+            final_resume=state.current_resume,
+            draft_resume=state.draft_resume,
+            review_rounds=state.review_rounds,
+            supervisor_rounds=state.supervisor_rounds,
             retrieval_hits=hits,
+            stats={
+                "json_parse": {name: stats.to_dict() for name, stats in json_parse.items()},
+                "supervisor_paths": dict(Counter(decision.path for decision in state.supervisor_rounds)),
+            },
         )
+
+    def _json_parse_totals(self, carried: dict[str, JSONParseStats]) -> dict[str, JSONParseStats]:
+        current = {"reviewer": self.reviewer.parse_stats, "supervisor": self.supervisor.parse_stats}
+        return {name: carried.get(name, JSONParseStats()).combined(stats) for name, stats in current.items()}
+
+    def _retrieve_sections(self, job_description: str) -> dict[str, list[RetrievalHit]]:
+        section_hits = {
+            key: self.vector_store.search(f"{hint}\n\n{job_description}", top_k=self.settings.section_top_k)
+            for key, (_, hint) in RESUME_SECTIONS.items()
+        }
+        section_hits[HEADER_KEY] = self.vector_store.search(HEADER_HINT, top_k=self.settings.section_top_k)
+        return section_hits
+
+    def _draft_by_section(self, job_description: str, section_hits: dict[str, list[RetrievalHit]]) -> str:
+        keys = [key for key in RESUME_SECTIONS if key in section_hits]
+        with ThreadPoolExecutor(max_workers=len(keys)) as pool:
+            futures = {
+                key: pool.submit(self._draft_section, job_description, key, section_hits[key]) for key in keys
+            }
+            sections = [futures[key].result().strip() for key in keys]
+
+        body = "\n\n".join(
+            _harmonize_sections(
+                [section for section in sections if section and section.strip("` \n") != EMPTY_SECTION_MARKER]
+            )
+        )
+        with self.profiler.stage("intern.draft_summary"):
+            header = self.intern.draft_summary(
+                job_description=job_description,
+                context=_format_hits(section_hits.get(HEADER_KEY, [])),
+                sections=body,
+            ).strip()
+        return f"{header}\n\n{body}".strip()
+
+    def _draft_section(self, job_description: str, key: str, hits: list[RetrievalHit]) -> str:
+        # Runs on a pool thread, which the enclosing "intern.draft" profile cannot see.
+        with self.profiler.stage(f"intern.draft_section.{key}"):
+            return self.intern.draft_section(
+                job_description=job_description,
+                heading=RESUME_SECTIONS[key][0],
+                context=_format_hits(hits),
+            )
+
+
+def _harmonize_sections(sections: list[str]) -> list[str]:
+    """Drop bullets and subheadings that repeat one from an earlier section.
+
+    Sections are drafted independently, so the same project often shows up
+    under both Experience and Projects. A repeated subheading drops its whole
+    block, a subheading left without content is dropped, and so is a section
+    left with only its heading.
+    """
+    seen_bullets: list[set[str]] = []
+    seen_headings: list[set[str]] = []
+    harmonized: list[str] = []
+
+    for section in sections:
+        kept: list[str] = []
+        section_bullets: list[set[str]] = []
+        section_headings: list[set[str]] = []
+        skipping = False
+        for line in section.splitlines():
+            stripped = line.strip()
+            if stripped.startswith("## "):
+                skipping = False
+                kept.append(line)
+                continue
+            if stripped.startswith("###"):
+                words = _words(stripped)
+                skipping = _overlaps(words, seen_headings)
+                if not skipping:
+                    section_headings.append(words)
+                    kept.append(line)
+                continue
+            if skipping:
+                continue
+            if stripped[:2] in {"- ", "* "}:
+                words = _words(stripped)
+                if _overlaps(words, seen_bullets):
+                    continue
+                section_bullets.append(words)
+            kept.append(line)
+
+        seen_bullets.extend(section_bullets)
+        seen_headings.extend(section_headings)
+        text = "\n".join(_drop_empty_subheadings(kept)).strip()
+        if any(line.strip() and not line.lstrip().startswith("## ") for line in text.splitlines()):
+            harmonized.append(text)
+    return harmonized
+
+
+def _drop_empty_subheadings(lines: list[str]) -> list[str]:
+    kept: list[str] = []
+    for line in reversed(lines):
+        stripped = line.strip()
+        if stripped.startswith("###"):
+            following = next((item.strip() for item in reversed(kept) if item.strip()), "")
+            if not following or following.startswith("#"):
+                continue
+        kept.append(line)
+    return kept[::-1]
+
+
+def _words(line: str) -> set[str]:
+    return set(_WORD_PATTERN.findall(line.lower()))
+
+
+def _overlaps(words: set[str], seen: list[set[str]]) -> bool:
+    if not words:
+        return False
+    return any(len(words & other) / len(words | other) >= SECTION_OVERLAP_THRESHOLD for other in seen)
+
+
+def _merge_hits(groups: Iterable[list[RetrievalHit]]) -> list[RetrievalHit]:
+    best: dict[str, RetrievalHit] = {}
+    for hits in groups:
+        for hit in hits:
+            current = best.get(hit.chunk.chunk_id)
+            if current is None or hit.score > current.score:
+                best[hit.chunk.chunk_id] = hit
+    return sorted(best.values(), key=lambda hit: hit.score, reverse=True)
+
+
+def _format_hits(hits: list[RetrievalHit]) -> str:
+    return format_retrieval_context(
+        [
+            {
+                "source": hit.chunk.source,
+                "text": hit.chunk.text,
+            }
+            for hit in hits
+        ]
+    )
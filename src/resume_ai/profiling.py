@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import cProfile
+import json
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+
+TOP_ALLOCATION_SITES = 25
+
+
+class StageProfiler:
+    """Per-stage cProfile, tracemalloc and peak RSS capture for pipeline runs.
+
+    A profiler created without an output directory is disabled: `stage`
+    returns a shared no-op context manager and records nothing.
+
+    Stages may run on worker threads. cProfile only sees the thread that
+    enabled it, so each thread profiles its own outermost stage and CPU time
+    is per thread off the main thread; tracemalloc figures of stages that
+    overlap in time include each other's allocations.
+    """
+
+    def __init__(self, output_dir: str | Path | None = None) -> None:
+        self.output_dir = Path(output_dir) if output_dir is not None else None
+        self.stages: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def enabled(self) -> bool:
+        return self.output_dir is not None
+
+    def stage(self, name: str):
+        if self.output_dir is None:
+            return _NOOP
+        return self._profile_stage(name)
+
+    @contextmanager
+    def _profile_stage(self, name: str) -> Iterator[None]:
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+        rss_start, peak_start = _current_rss_bytes(), _peak_rss_bytes()
+
+        # One cProfile per thread; nested stages record memory and timing only.
+        profile = _start_profile() if getattr(self._local, "active", None) is None else None
+        if profile is not None:
+            self._local.active = profile
+        cpu_clock = time.process_time if threading.current_thread() is threading.main_thread() else time.thread_time
+        wall_start = time.perf_counter()
+        cpu_start = cpu_clock()
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+                self._local.active = None
+            wall = time.perf_counter() - wall_start
+            cpu = cpu_clock() - cpu_start
+            _, traced_peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot()
+            peak_end = _peak_rss_bytes()
+            rss = {
+                "rss_start_bytes": rss_start,
+                "rss_end_bytes": _current_rss_bytes(),
+                "peak_rss_bytes": peak_end,
+                # Non-zero only for the stage that pushed the process high-water mark up.
+                "peak_rss_increase_bytes": None if peak_end is None else peak_end - peak_start,
+            }
+            self._record(name, profile, before, after, wall, cpu, traced_peak, rss)
+
+    def write_summary(self) -> Path | None:
+        if self.output_dir is None:
+            return None
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        target = self.output_dir / "summary.json"
+        with self._lock:
+            summary = json.dumps({"stages": self.stages}, indent=2)
+        target.write_text(summary, encoding="utf-8")
+        return target
+
+    def _record(
+        self,
+        name: str,
+        profile: cProfile.Profile | None,
+        before: tracemalloc.Snapshot,
+        after: tracemalloc.Snapshot,
+        wall: float,
+        cpu: float,
+        traced_peak: int,
+        rss: dict[str, int | None],
+    ) -> None:
+        with self._lock:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            prefix = f"{len(self.stages) + 1:02d}_{re.sub(r'[^A-Za-z0-9_.-]+', '_', name)}"
+            # Reserve the number before writing files so concurrent stages never share a prefix.
+            entry: dict[str, Any] = {"stage": name}
+            self.stages.append(entry)
+
+        profile_file = None
+        if profile is not None:
+            profile_file = self.output_dir / f"{prefix}.prof"
+            profile.dump_stats(profile_file)
+
+        diff = after.compare_to(before, "lineno")
+        alloc_file = self.output_dir / f"{prefix}_alloc.txt"
+        alloc_file.write_text(
+            "\n".join(str(stat) for stat in diff[:TOP_ALLOCATION_SITES]) + "\n",
+            encoding="utf-8",
+        )
+
+        entry.update(
+            {
+                "thread": threading.current_thread().name,
+                "wall_seconds": round(wall, 4),
+                "cpu_seconds": round(cpu, 4),
+                "traced_peak_bytes": traced_peak,
+                "traced_net_bytes": sum(stat.size_diff for stat in diff),
+                **rss,
+                "profile": profile_file.name if profile_file else None,
+                "allocations": alloc_file.name,
+            }
+        )
+
+
+def _start_profile() -> cProfile.Profile | None:
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError:
+        # Python 3.12+ allows a single process-wide profiler, which already covers worker threads.
+        return None
+    return profile
+
+
+def _current_rss_bytes() -> int | None:
+    """Resident set size right now, falling back to the high-water mark where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as statm:
+            resident_pages = int(statm.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return _peak_rss_bytes()
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def _peak_rss_bytes() -> int | None:
+    """Process RSS high-water mark so far (ru_maxrss covers the whole process lifetime)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+_NOOP = nullcontext()
+DISABLED_PROFILER = StageProfiler()
@@ -17,16 +17,25 @@ Output only Markdown.
 """
 
 
-def intern_draft_user_prompt(job_description: str, context: str) -> str:
-    return f"""Create a customized one-page resume in Markdown for this job description.
-Focus on relevance and ATS-friendly phrasing while staying truthful to the supplied evidence.
+def intern_shared_prefix(job_description: str, context: str) -> str:
+    """Leading block shared by the draft and every revision prompt.
 
-Job description:
+    Ollama reuses its KV cache for a matching prompt prefix, so the long, stable
+    job description and evidence come first and the per-call task follows.
+    """
+    return f"""Job description:
 {job_description}
 
 Candidate evidence (RAG context):
 {context}
 
+"""
+
+
+def intern_draft_user_prompt(job_description: str, context: str) -> str:
+    return intern_shared_prefix(job_description, context) + """Task: create a customized one-page resume in Markdown for this job description.
+Focus on relevance and ATS-friendly phrasing while staying truthful to the supplied evidence.
+
 Required output structure:
 1. # Candidate Name (placeholder if unknown)
 2. ## Summary
@@ -42,6 +51,43 @@ Rules:
 """
 
 
+# Section key -> (heading, retrieval hint). Order is the order sections appear in the resume.
+RESUME_SECTIONS: dict[str, tuple[str, str]] = {
+    "skills": ("Skills", "technical skills, programming languages, tools, frameworks"),
+    "experience": ("Experience", "work experience, roles, responsibilities, achievements, impact"),
+    "projects": ("Projects", "projects, side projects, open source, research"),
+    "education": ("Education", "education, degrees, universities, certifications, courses"),
+}
+
+EMPTY_SECTION_MARKER = "NONE"
+# Retrieval query for the resume header; it is searched on its own so the job description does not outrank contact details.
+HEADER_HINT = "candidate name, contact information, email, phone, location, LinkedIn, GitHub, website"
+
+
+def intern_section_user_prompt(job_description: str, heading: str, context: str) -> str:
+    return intern_shared_prefix(job_description, context) + f"""Task: write only the `## {heading}` section of a customized one-page resume in Markdown for this job description.
+Focus on relevance and ATS-friendly phrasing while staying truthful to the supplied evidence.
+
+Rules:
+- Start with the `## {heading}` heading and output nothing after the section.
+- Do not fabricate details.
+- If specific metrics are unavailable, write impact without numbers.
+- Keep bullet points tight.
+- If the evidence has nothing for this section, output exactly {EMPTY_SECTION_MARKER}.
+"""
+
+
+def intern_summary_user_prompt(job_description: str, context: str, sections: str) -> str:
+    return intern_shared_prefix(job_description, context) + f"""Resume sections:
+{sections}
+
+Task: the resume sections above were written for this job description.
+Write only the top of the resume: a `# Candidate Name` heading followed by a `## Summary` section of two to three sentences.
+Take the name and contact details from the candidate evidence; use the placeholder only if the evidence has no name.
+Base the summary only on the resume sections.
+"""
+
+
 def intern_revision_user_prompt(
     job_description: str,
     current_resume: str,
@@ -50,12 +96,9 @@ def intern_revision_user_prompt(
     context: str,
 ) -> str:
     focus_text = "\n".join([f"- {item}" for item in supervisor_focus]) or "- Improve overall alignment"
-    return f"""Revise the resume using reviewer feedback and supervisor priorities.
+    return intern_shared_prefix(job_description, context) + f"""Task: revise the current resume using reviewer feedback and supervisor priorities.
 Keep only verifiable facts from the provided evidence.
 
-Job description:
-{job_description}
-
 Current resume:
 {current_resume}
 
@@ -65,9 +108,6 @@ Reviewer feedback:
 Supervisor focus areas:
 {focus_text}
 
-Candidate evidence (RAG context):
-{context}
-
 Output only the updated Markdown resume.
 """
 
@@ -78,6 +118,20 @@ Return JSON only.
 """
 
 
+REVIEWER_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "decision": {"type": "string", "enum": ["accept", "revise"]},
+        "score": {"type": "number", "minimum": 0, "maximum": 10},
+        "summary": {"type": "string"},
+        "strengths": {"type": "array", "items": {"type": "string"}},
+        "risks": {"type": "array", "items": {"type": "string"}},
+        "edits": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["decision", "score", "summary", "strengths", "risks", "edits"],
+}
+
+
 def reviewer_user_prompt(job_description: str, resume: str) -> str:
     return f"""Review this resume against the job description and return JSON with this schema:
 {{
@@ -103,6 +157,22 @@ Return JSON only.
 """
 
 
+SUPERVISOR_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "action": {"type": "string", "enum": ["accept", "revise"]},
+        "reason": {"type": "string"},
+        "focus": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["action", "reason", "focus"],
+}
+
+
+JSON_RETRY_SUFFIX = """
+Your previous reply could not be parsed. Return only the JSON object, with no other text.
+"""
+
+
 def supervisor_user_prompt(
     round_number: int,
     max_rounds: int,
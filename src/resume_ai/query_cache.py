@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+
+DEFAULT_MAX_ENTRIES = 256
+
+
+class QueryCache:
+    """LRU caches for query embeddings and retrieval results, optionally persisted to JSON.
+
+    Embeddings are keyed by encoder fingerprint and normalized query text.
+    Results are keyed by index fingerprint, `top_k` and query, so they are
+    invalidated automatically whenever the index contents change.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, path: str | Path | None = None) -> None:
+        self.max_entries = max_entries
+        self.path = Path(path) if path is not None else None
+        self.stats = {"embedding_hits": 0, "embedding_misses": 0, "result_hits": 0, "result_misses": 0}
+        self._embeddings: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._results: OrderedDict[str, list[tuple[int, float]]] = OrderedDict()
+        self._dirty = False
+        if self.path is not None:
+            self._load()
+
+    def get_embedding(self, encoder_key: str, query: str) -> np.ndarray | None:
+        vector = _lru_get(self._embeddings, _key(encoder_key, query))
+        self.stats["embedding_hits" if vector is not None else "embedding_misses"] += 1
+        return vector
+
+    def put_embedding(self, encoder_key: str, query: str, vector: np.ndarray) -> None:
+        _lru_put(self._embeddings, _key(encoder_key, query), vector, self.max_entries)
+        self._dirty = True
+
+    def get_results(self, index_key: str, query: str, top_k: int) -> list[tuple[int, float]] | None:
+        results = _lru_get(self._results, _key(index_key, str(top_k), query))
+        self.stats["result_hits" if results is not None else "result_misses"] += 1
+        return results
+
+    def put_results(self, index_key: str, query: str, top_k: int, results: list[tuple[int, float]]) -> None:
+        _lru_put(self._results, _key(index_key, str(top_k), query), results, self.max_entries)
+        self._dirty = True
+
+    def save(self) -> None:
+        if self.path is None or not self._dirty:
+            return
+        payload = {
+            "embeddings": {key: vector.tolist() for key, vector in self._embeddings.items()},
+            "results": {key: [[i, score] for i, score in hits] for key, hits in self._results.items()},
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(payload), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+    def _load(self) -> None:
+        try:
+            payload = json.loads(self.path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        for key, vector in payload.get("embeddings", {}).items():
+            _lru_put(self._embeddings, key, np.asarray(vector, dtype=np.float32), self.max_entries)
+        for key, hits in payload.get("results", {}).items():
+            _lru_put(self._results, key, [(int(i), float(score)) for i, score in hits], self.max_entries)
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.split())
+
+
+def _key(*parts: str) -> str:
+    *prefix, query = parts
+    return "\x1f".join([*prefix, normalize_query(query)])
+
+
+def _lru_get(cache: OrderedDict, key: str):
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+    return value
+
+
+def _lru_put(cache: OrderedDict, key: str, value, max_entries: int) -> None:
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > max_entries:
+        cache.popitem(last=False)
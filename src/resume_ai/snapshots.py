@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+
+DEFAULT_KEEP_SNAPSHOTS = 3
+SNAPSHOT_PREFIX = "v"
+
+
+def manifest_path(base: Path) -> Path:
+    return base.with_name(f"{base.name}.manifest.json")
+
+
+def snapshots_root(base: Path) -> Path:
+    return base.with_name(f"{base.name}.snapshots")
+
+
+def snapshot_dir(base: Path, version: int) -> Path:
+    return snapshots_root(base) / f"{SNAPSHOT_PREFIX}{version:06d}"
+
+
+def read_manifest(base: Path) -> dict | None:
+    try:
+        manifest = json.loads(manifest_path(base).read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("version"), int):
+        return None
+    return manifest
+
+
+@contextmanager
+def writer_lock(base: Path) -> Iterator[None]:
+    """Serialize snapshot writers for one index; readers never take the lock."""
+    lock_path = base.with_name(f"{base.name}.lock")
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with lock_path.open("a") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+def publish_snapshot(
+    base: Path,
+    write: Callable[[Path], None],
+    keep: int = DEFAULT_KEEP_SNAPSHOTS,
+) -> int:
+    """Write a new immutable snapshot with `write(directory)` and atomically point the manifest at it.
+
+    Returns the published version number.
+    """
+    with writer_lock(base):
+        current = read_manifest(base)
+        version = (current["version"] if current else 0) + 1
+
+        root = snapshots_root(base)
+        root.mkdir(parents=True, exist_ok=True)
+        staging = root / f".staging-{version}-{os.getpid()}"
+        if staging.exists():
+            shutil.rmtree(staging)
+        staging.mkdir()
+        try:
+            write(staging)
+            os.replace(staging, snapshot_dir(base, version))
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        target = manifest_path(base)
+        tmp_path = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps({"version": version}), encoding="utf-8")
+        os.replace(tmp_path, target)
+
+        _prune(base, keep=keep, current=version)
+
+    return version
+
+
+def _prune(base: Path, keep: int, current: int) -> None:
+    # Readers load a snapshot fully into memory, so only a reader that has read the
+    # manifest but not yet opened the files can race with pruning; it retries.
+    oldest_kept = current - max(1, keep) + 1
+    for path in snapshots_root(base).iterdir():
+        name = path.name
+        if not name.startswith(SNAPSHOT_PREFIX) or not name[len(SNAPSHOT_PREFIX) :].isdigit():
+            continue
+        if int(name[len(SNAPSHOT_PREFIX) :]) < oldest_kept:
+            shutil.rmtree(path, ignore_errors=True)
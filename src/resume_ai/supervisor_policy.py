@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from .config import SupervisorPolicyConfig
+from .types import ReviewFeedback, SupervisorDecision
+
+
+PATH_LLM = "llm"
+PATH_FINAL_ROUND = "rule:final_round"
+PATH_BELOW_MIN_SCORE = "rule:below_min_score"
+PATH_AUTO_ACCEPT = "rule:auto_accept"
+
+
+class SupervisorPolicy:
+    """Deterministic rules that settle a supervisor decision without calling the model.
+
+    `resolve` returns None when the review is ambiguous and the supervisor LLM
+    should decide.
+    """
+
+    def __init__(self, config: SupervisorPolicyConfig, max_rounds: int) -> None:
+        self.config = config
+        self.max_rounds = max_rounds
+
+    def resolve(self, review: ReviewFeedback, round_number: int) -> SupervisorDecision | None:
+        if not self.config.enabled:
+            return None
+
+        if round_number >= self.max_rounds:
+            # The supervisor's answer is always overridden to accept on the last round.
+            return SupervisorDecision(
+                action="accept",
+                reason="Max rounds reached; finishing with current best draft.",
+                path=PATH_FINAL_ROUND,
+            )
+
+        if review.score < self.config.min_accept_score:
+            # Any accept from the supervisor would be overridden to revise at this score.
+            return SupervisorDecision(
+                action="revise",
+                reason=f"Reviewer score {review.score:g} is below {self.config.min_accept_score:g}.",
+                focus=review.edits[:3],
+                path=PATH_BELOW_MIN_SCORE,
+            )
+
+        if (
+            review.decision == "accept"
+            and review.score >= self.config.auto_accept_score
+            and len(review.risks) <= self.config.auto_accept_max_risks
+        ):
+            return SupervisorDecision(
+                action="accept",
+                reason=f"Reviewer accepted with score {review.score:g}.",
+                path=PATH_AUTO_ACCEPT,
+            )
+
+        return None
@@ -4,20 +4,22 @@ from dataclasses import asdict, dataclass, field
 from typing import Any
 
 
-@dataclass
+@dataclass(slots=True)
 class Document:
     source: str
     text: str
+    duplicate_sources: list[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class Chunk:
     chunk_id: str
     source: str
     text: str
+    duplicate_sources: list[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class RetrievalHit:
     chunk: Chunk
     score: float
@@ -43,10 +45,30 @@ class SupervisorDecision:
     reason: str
     focus: list[str] = field(default_factory=list)
     raw_text: str = ""
+    path: str = "llm"
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class JSONParseStats:
+    calls: int = 0
+    parse_failures: int = 0
+    retries: int = 0
+    fallbacks: int = 0
 
     def to_dict(self) -> dict[str, Any]:
         return asdict(self)
 
+    def combined(self, other: JSONParseStats) -> JSONParseStats:
+        return JSONParseStats(
+            calls=self.calls + other.calls,
+            parse_failures=self.parse_failures + other.parse_failures,
+            retries=self.retries + other.retries,
+            fallbacks=self.fallbacks + other.fallbacks,
+        )
+
 
 @dataclass
 class RunResult:
@@ -55,3 +77,4 @@ class RunResult:
     review_rounds: list[ReviewFeedback]
     supervisor_rounds: list[SupervisorDecision]
     retrieval_hits: list[RetrievalHit]
+    stats: dict[str, Any] = field(default_factory=dict)
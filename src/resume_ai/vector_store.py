@@ -1,75 +1,144 @@
 from __future__ import annotations
 
+import hashlib
 import json
 from pathlib import Path
 
 import numpy as np
-from sentence_transformers import SentenceTransformer
 
+from .chunking import ChunkTable, ordinals_from_grouping
+from .encoders import Encoder, create_encoder
+from .query_cache import QueryCache
+from .snapshots import publish_snapshot, read_manifest, snapshot_dir
 from .types import Chunk, RetrievalHit
 
 
+METADATA_FORMAT_VERSION = 2
+SNAPSHOT_BASENAME = "index"
+SNAPSHOT_LOAD_ATTEMPTS = 3
+ENCODER_STATE_PREFIX = "encoder_"
+
+
 class VectorStoreError(ValueError):
     """Raised for vector store related errors."""
 
 
 class LocalVectorStore:
-    def __init__(self, embedding_model: str):
+    def __init__(
+        self,
+        embedding_model: str,
+        workers: int = 1,
+        batch_size: int = 64,
+        encoder: Encoder | None = None,
+        query_cache: QueryCache | None = None,
+    ):
         self.embedding_model = embedding_model
-        self._encoder = SentenceTransformer(embedding_model)
-        self._chunks: list[Chunk] = []
+        self.workers = workers
+        self.batch_size = batch_size
+        try:
+            self._encoder = encoder or create_encoder(embedding_model)
+        except ValueError as exc:
+            raise VectorStoreError(str(exc)) from exc
+        self._chunks = ChunkTable([], [], [], [], [], [])
         self._matrix: np.ndarray | None = None
+        self.snapshot_version: int | None = None
+        self.query_cache = query_cache
+        self._fingerprint: str | None = None
 
     @property
     def size(self) -> int:
         return len(self._chunks)
 
-    def build(self, chunks: list[Chunk]) -> None:
-        if not chunks:
+    def build(self, chunks: ChunkTable | list[Chunk]) -> None:
+        if not len(chunks):
             raise VectorStoreError("Cannot build index from empty chunks.")
+        if not isinstance(chunks, ChunkTable):
+            chunks = ChunkTable.from_chunks(chunks)
 
-        texts = [c.text for c in chunks]
-        embeddings = self._encoder.encode(
-            texts,
-            normalize_embeddings=True,
-            convert_to_numpy=True,
-            show_progress_bar=False,
-        )
+        texts = list(chunks.iter_texts())
+        embeddings = self._encoder.encode_corpus(texts, batch_size=self.batch_size, workers=self.workers)
         self._chunks = chunks
-        self._matrix = embeddings.astype(np.float32)
+        self._matrix = embeddings
+        # Hashed once here and saved with the index, so searches never rehash the matrix.
+        self._fingerprint = self._content_fingerprint()
+        self.snapshot_version = None
 
-    def save(self, index_path: str | Path) -> None:
+    def save(self, index_path: str | Path) -> int:
+        """Publish the index as a new immutable snapshot and return its version."""
         if self._matrix is None:
             raise VectorStoreError("No index to save. Build or load first.")
 
         target = Path(index_path)
-        target.parent.mkdir(parents=True, exist_ok=True)
+        version = publish_snapshot(target, lambda directory: self._write_files(directory / SNAPSHOT_BASENAME))
+        self.snapshot_version = version
+        return version
 
-        np.savez_compressed(target, embeddings=self._matrix)
-        metadata_path = _metadata_path(target)
+    def load(self, index_path: str | Path) -> None:
+        target = Path(index_path)
+        manifest = read_manifest(target)
+        if manifest is None:
+            # Indexes written before snapshots were introduced live directly at the base path.
+            self._load_files(target)
+            self.snapshot_version = None
+            return
+
+        for _ in range(SNAPSHOT_LOAD_ATTEMPTS):
+            version = manifest["version"]
+            try:
+                self._load_files(snapshot_dir(target, version) / SNAPSHOT_BASENAME)
+            except (VectorStoreError, FileNotFoundError):
+                # A writer may have pruned the snapshot between reading the manifest and opening it.
+                latest = read_manifest(target)
+                if latest is None or latest["version"] == version:
+                    raise
+                manifest = latest
+                continue
+            self.snapshot_version = version
+            return
+
+        raise VectorStoreError(f"Index at {target} kept changing while loading; try again.")
+
+    def refresh(self, index_path: str | Path) -> bool:
+        """Reload if a newer snapshot has been published since this store was loaded."""
+        manifest = read_manifest(Path(index_path))
+        if manifest is None or manifest["version"] == self.snapshot_version:
+            return False
+        self.load(index_path)
+        return True
+
+    def _write_files(self, base: Path) -> None:
+        np.savez_compressed(
+            _npz_path(base),
+            embeddings=self._matrix,
+            doc_indices=self._chunks.doc_indices,
+            starts=self._chunks.starts,
+            ends=self._chunks.ends,
+            ordinals=self._chunks.ordinals,
+            **{f"{ENCODER_STATE_PREFIX}{name}": value for name, value in self._encoder.state().items()},
+        )
         metadata = {
+            "format_version": METADATA_FORMAT_VERSION,
             "embedding_model": self.embedding_model,
-            "chunks": [
-                {"chunk_id": c.chunk_id, "source": c.source, "text": c.text}
-                for c in self._chunks
-            ],
+            "sources": self._chunks.sources,
+            "texts": self._chunks.texts,
+            "duplicates": {str(i): sources for i, sources in self._chunks.duplicates.items()},
+            "fingerprint": self.fingerprint(),
         }
-        metadata_path.write_text(json.dumps(metadata, indent=2), encoding="utf-8")
+        _metadata_path(base).write_text(json.dumps(metadata), encoding="utf-8")
 
-    def load(self, index_path: str | Path) -> None:
-        target = Path(index_path)
-        embeddings_file = _npz_path(target)
-        metadata_file = _metadata_path(target)
+    def _load_files(self, base: Path) -> None:
+        embeddings_file = _npz_path(base)
+        metadata_file = _metadata_path(base)
 
         if not embeddings_file.exists() or not metadata_file.exists():
             raise VectorStoreError(
-                f"Index files not found for base path {target}. Expected {embeddings_file} and {metadata_file}."
+                f"Index files not found for base path {base}. Expected {embeddings_file} and {metadata_file}."
             )
 
-        data = np.load(embeddings_file)
-        self._matrix = data["embeddings"].astype(np.float32)
-
+        with np.load(embeddings_file) as data:
+            arrays = {name: data[name] for name in data.files}
         metadata = json.loads(metadata_file.read_text(encoding="utf-8"))
+
         model_name = metadata.get("embedding_model")
         if model_name and model_name != self.embedding_model:
             raise VectorStoreError(
@@ -77,31 +146,82 @@ class LocalVectorStore:
                 f"Index model is `{model_name}` but runtime model is `{self.embedding_model}`."
             )
 
-        self._chunks = [Chunk(**item) for item in metadata.get("chunks", [])]
-        if len(self._chunks) != len(self._matrix):
+        matrix = arrays["embeddings"].astype(np.float32)
+        if "chunks" in metadata:
+            # Indexes saved before offsets were introduced store one materialized chunk per entry.
+            chunks = ChunkTable.from_chunks([Chunk(**item) for item in metadata["chunks"]])
+        else:
+            if "doc_indices" not in arrays:
+                raise VectorStoreError(f"Index file {embeddings_file} is missing chunk offsets.")
+            chunks = ChunkTable(
+                metadata.get("sources", []),
+                metadata.get("texts", []),
+                arrays["doc_indices"],
+                arrays["starts"],
+                arrays["ends"],
+                arrays["ordinals"] if "ordinals" in arrays else ordinals_from_grouping(arrays["doc_indices"]),
+                {int(i): list(sources) for i, sources in metadata.get("duplicates", {}).items()},
+            )
+        if len(chunks) != len(matrix):
             raise VectorStoreError("Chunk count does not match embedding count in loaded index.")
 
+        self._encoder.load_state(
+            {
+                name[len(ENCODER_STATE_PREFIX) :]: value
+                for name, value in arrays.items()
+                if name.startswith(ENCODER_STATE_PREFIX)
+            }
+        )
+        self._chunks = chunks
+        self._matrix = matrix
+        self._fingerprint = metadata.get("fingerprint") or _file_fingerprint(self._encoder, embeddings_file)
+
     def search(self, query: str, top_k: int) -> list[RetrievalHit]:
         if self._matrix is None or not self._chunks:
             raise VectorStoreError("Index is empty. Build or load before searching.")
         if top_k <= 0:
             raise VectorStoreError("`top_k` must be greater than 0.")
 
-        query_vector = self._encoder.encode(
-            [query],
-            normalize_embeddings=True,
-            convert_to_numpy=True,
-            show_progress_bar=False,
-        )[0].astype(np.float32)
+        top_k = min(top_k, len(self._chunks))
+        cache = self.query_cache
+        if cache is None:
+            return self._to_hits(self._rank(self._encode_query(query), top_k))
+
+        ranked = cache.get_results(self.fingerprint(), query, top_k)
+        if ranked is None:
+            encoder_key = self._encoder.fingerprint()
+            query_vector = cache.get_embedding(encoder_key, query)
+            if query_vector is None:
+                query_vector = self._encode_query(query)
+                cache.put_embedding(encoder_key, query, query_vector)
+            ranked = self._rank(query_vector, top_k)
+            cache.put_results(self.fingerprint(), query, top_k, ranked)
+        return self._to_hits(ranked)
+
+    def fingerprint(self) -> str:
+        """Identity of the loaded index, used to invalidate cached retrieval results."""
+        if self._fingerprint is None:
+            raise VectorStoreError("Index is empty. Build or load before searching.")
+        return self._fingerprint
+
+    def _content_fingerprint(self) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(self._encoder.fingerprint().encode("utf-8"))
+        digest.update(self._matrix.tobytes())
+        for offsets in (self._chunks.doc_indices, self._chunks.starts, self._chunks.ends, self._chunks.ordinals):
+            digest.update(offsets.tobytes())
+        return digest.hexdigest()
+
+    def _encode_query(self, query: str) -> np.ndarray:
+        return self._encoder.encode([query], batch_size=1)[0]
 
+    def _rank(self, query_vector: np.ndarray, top_k: int) -> list[tuple[int, float]]:
         scores = self._matrix @ query_vector
-        top_k = min(top_k, len(self._chunks))
         indices = np.argsort(scores)[-top_k:][::-1]
+        return [(int(i), float(scores[i])) for i in indices]
 
-        return [
-            RetrievalHit(chunk=self._chunks[i], score=float(scores[i]))
-            for i in indices
-        ]
+    def _to_hits(self, ranked: list[tuple[int, float]]) -> list[RetrievalHit]:
+        return [RetrievalHit(chunk=self._chunks[i], score=score) for i, score in ranked]
 
 
 def _metadata_path(base: Path) -> Path:
@@ -110,3 +230,10 @@ def _metadata_path(base: Path) -> Path:
 
 def _npz_path(base: Path) -> Path:
     return base.with_suffix(".npz")
+
+
+def _file_fingerprint(encoder: Encoder, embeddings_file: Path) -> str:
+    # Indexes saved before fingerprints were stored: key on the file identity instead of hashing its contents.
+    stat = embeddings_file.stat()
+    identity = f"{encoder.fingerprint()}|{embeddings_file.resolve()}|{stat.st_size}|{stat.st_mtime_ns}"
+    return hashlib.blake2b(identity.encode("utf-8"), digest_size=16).hexdigest()
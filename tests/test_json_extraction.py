@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+pytest.importorskip("ollama")
+
+from resume_ai.agents import _extract_json_object
+
+
+def test_prose_with_stray_brace_before_object():
+    text = 'Sure { here is the review:\n```json\n{"decision": "accept", "score": 8.5}\n```'
+    assert _extract_json_object(text) == {"decision": "accept", "score": 8.5}
+
+
+def test_reasoning_block_is_stripped():
+    text = '<think>maybe {"decision": "revise"} is right</think>\n{"decision": "accept"}'
+    assert _extract_json_object(text) == {"decision": "accept"}
+
+
+def test_valid_object_nested_in_malformed_outer():
+    assert _extract_json_object('{"outer": {bad}, "x": {"inner": 1}}') == {"inner": 1}
+
+
+def test_braces_inside_strings_are_ignored():
+    assert _extract_json_object('note: {"summary": "use } and { freely"} done') == {"summary": "use } and { freely"}
+
+
+def test_unmatched_braces_scan_in_linear_time():
+    started = time.perf_counter()
+    assert _extract_json_object("{ a " * 4000 + "{" * 8000) is None
+    assert time.perf_counter() - started < 1.0
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import json
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+ollama = pytest.importorskip("ollama")
+
+from resume_ai.config import OllamaEndpointConfig
+from resume_ai.ollama_router import OllamaRouter
+
+
+class StubOllama:
+    """Minimal local Ollama stand-in serving /api/chat and /api/tags."""
+
+    def __init__(self, name: str, delay: float = 0.0, fail_first: int = 0, port: int = 0) -> None:
+        self.name = name
+        self.delay = delay
+        self.fail_first = fail_first
+        self.requests = 0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                self._reply(200, {"models": []})
+
+            def do_POST(self) -> None:
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with stub._lock:
+                    stub.requests += 1
+                    stub.active += 1
+                    stub.max_active = max(stub.max_active, stub.active)
+                    failing = stub.requests <= stub.fail_first
+                try:
+                    time.sleep(stub.delay)
+                    if failing:
+                        self._reply(500, {"error": "transient failure"})
+                    else:
+                        self._reply(
+                            200,
+                            {
+                                "model": "m",
+                                "message": {"role": "assistant", "content": stub.name},
+                                "done": True,
+                            },
+                        )
+                finally:
+                    with stub._lock:
+                        stub.active -= 1
+
+            def _reply(self, status: int, payload: dict) -> None:
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+@pytest.fixture
+def stubs():
+    created: list[StubOllama] = []
+
+    def make(*args, **kwargs) -> StubOllama:
+        stub = StubOllama(*args, **kwargs)
+        created.append(stub)
+        return stub
+
+    yield make
+    for stub in created:
+        stub.close()
+
+
+def _unused_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _unused_url() -> str:
+    return f"http://127.0.0.1:{_unused_port()}"
+
+
+def _chat(router: OllamaRouter) -> str:
+    response = router.chat(model="m", messages=[{"role": "user", "content": "hi"}])
+    return response["message"]["content"]
+
+
+def test_fails_over_to_next_endpoint(stubs):
+    healthy = stubs("b")
+    router = OllamaRouter(
+        [OllamaEndpointConfig(url=_unused_url()), OllamaEndpointConfig(url=healthy.url)],
+        health_check_interval=None,
+    )
+
+    assert _chat(router) == "b"
+    assert _chat(router) == "b"
+    stats = router.stats()
+    assert [item["healthy"] for item in stats.values()] == [False, True]
+    assert healthy.requests == 2
+
+
+def test_respects_per_endpoint_concurrency_cap(stubs):
+    a = stubs("a", delay=0.2)
+    b = stubs("b", delay=0.2)
+    router = OllamaRouter(
+        [
+            OllamaEndpointConfig(url=a.url, max_concurrency=1),
+            OllamaEndpointConfig(url=b.url, max_concurrency=2),
+        ],
+        health_check_interval=None,
+    )
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        results = list(pool.map(lambda _: _chat(router), range(6)))
+
+    assert sorted(set(results)) == ["a", "b"]
+    assert a.max_active == 1
+    assert b.max_active == 2
+
+
+def test_single_endpoint_recovers_after_transient_error(stubs):
+    flaky = stubs("a", fail_first=1)
+    router = OllamaRouter([OllamaEndpointConfig(url=flaky.url)], health_check_interval=None)
+
+    with pytest.raises(ollama.ResponseError):
+        _chat(router)
+    assert _chat(router) == "a"
+    assert next(iter(router.stats().values()))["healthy"] is True
+
+
+def test_check_health_marks_down_and_recovered_endpoints(stubs):
+    up = stubs("a")
+    down_port = _unused_port()
+    down_url = f"http://127.0.0.1:{down_port}"
+    router = OllamaRouter(
+        [OllamaEndpointConfig(url=up.url), OllamaEndpointConfig(url=down_url)],
+        health_check_interval=None,
+    )
+
+    assert router.check_health() == {up.url: True, down_url: False}
+
+    stubs("b", port=down_port)
+    assert router.check_health() == {up.url: True, down_url: True}
+    assert [item["healthy"] for item in router.stats().values()] == [True, True]